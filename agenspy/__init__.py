@@ -1,60 +1,105 @@
-import re
-import json
+import time
 
 import psycopg2
+import psycopg2.extensions
 
-from agenspy.cursor import Cursor
-from agenspy.graph import Graph, Subgraph
-from agenspy.types import GraphVertex, GraphEdge
+from agenspy.aio import AsyncGraph
+from agenspy.cursor import Cursor, QueryRecord
+from agenspy.graph import Graph, GraphBatch, Neighborhoods, Subgraph, ColumnarSubgraph
+from agenspy.pool import GraphPool
+from agenspy.profiling import Profiler, QueryStats
+from agenspy.types import GraphId, GraphVertex, GraphEdge
+from agenspy.types import _json_loads
 
-# ----- VERTEX --------------------------------------------------------------- #
+def _graph_of(cur):
+    '''
+    The Graph a cursor belongs to (the Graph itself or the graph
+    attribute of its server-side cursors), None for plain cursors.
+    '''
+    if isinstance(cur, Graph):
+        return cur
+    return getattr(cur, 'graph', None)
+
+def _profiled(cast):
+    '''
+    Account decoding time and size of vertices/edges to the pending
+    agenspy.profiling.QueryEvent of the cursor (or its graph), if any.
+    '''
+    def _cast(val, cur):
+        if val is None:
+            return None
+        graph = _graph_of(cur)
+        event = getattr(cur if graph is None else graph, '_profile_event', None)
+        if event is None:
+            return cast(val, graph)
+        started = time.perf_counter()
+        entity = cast(val, graph)
+        event.cast_seconds += time.perf_counter() - started
+        event.bytes_decoded += len(val)
+        return entity
+    return _cast
 
-_vertex_matcher = re.compile(r'(.+)\[(\d+\.\d+)\](.+)')
+# ----- GRAPHID -------------------------------------------------------------- #
 
-def _cast_vertex(val, cur):
+def _cast_graphid(val, cur):
     if val is None:
         return None
-    vertex_match = _vertex_matcher.match(val)
-    if vertex_match is None:
-        return ValueError
-    label = vertex_match.group(1)
-    ID = vertex_match.group(2)
-    properties = json.loads(vertex_match.group(3))
+    return GraphId.parse(val)
+
+GRAPHID = psycopg2.extensions.new_type((7002,), 'GRAPHID', _cast_graphid)
+psycopg2.extensions.register_type(GRAPHID)
+GRAPHIDARRAY = psycopg2.extensions.new_array_type((7001,), 'GRAPHID[]', GRAPHID)
+psycopg2.extensions.register_type(GRAPHIDARRAY)
+
+def _adapt_graphid(ID):
+    return psycopg2.extensions.AsIs("'{}'::graphid".format(ID))
+
+psycopg2.extensions.register_adapter(GraphId, _adapt_graphid)
+
+# ----- VERTEX --------------------------------------------------------------- #
+
+# label[labid.locid]{properties}
+
+def _cast_vertex(val, graph):
     try:
-        if isinstance(cur, Graph):
-            vertex = GraphVertex(ID, cur, label, properties)
-        else:
-            vertex = {'id': ID, 'label': label, 'properties': properties}
-    except:
-        return psycopg2.InterfaceError('Bad vertex representation: %s' % val)
-    return vertex
-
-VERTEX = psycopg2.extensions.new_type((7012,), 'VERTEX', _cast_vertex)
+        id_start = val.index('[')
+        id_end = val.index(']', id_start)
+        label = val[:id_start]
+        ID = GraphId.parse(val[id_start+1:id_end])
+        if graph is not None and graph.lazy_properties:
+            return GraphVertex(ID, graph, label, raw_properties=val[id_end+1:])
+        properties = _json_loads(val[id_end+1:])
+    except ValueError:
+        raise psycopg2.InterfaceError('Bad vertex representation: %s' % val)
+    if graph is not None:
+        return GraphVertex(ID, graph, label, properties)
+    return {'id': ID, 'label': label, 'properties': properties}
+
+VERTEX = psycopg2.extensions.new_type((7012,), 'VERTEX', _profiled(_cast_vertex))
 psycopg2.extensions.register_type(VERTEX)
 
 # ----- EDGE ----------------------------------------------------------------- #
 
-_edge_matcher = re.compile(r'(.+)\[(\d+\.\d+)\]\[(\d+\.\d+),(\d+\.\d+)\](.+)')
+# label[labid.locid][labid.locid,labid.locid]{properties}
 
-def _cast_edge(val, cur):
-    if val is None:
-        return None
-    edge_match = _edge_matcher.match(val)
-    if edge_match is None:
-        return ValueError
-    label = edge_match.group(1)
-    ID = edge_match.group(2)
-    sid = edge_match.group(3)
-    tid = edge_match.group(4)
-    properties = json.loads(edge_match.group(5))
+def _cast_edge(val, graph):
     try:
-        if isinstance(cur, Graph):
-            edge = GraphEdge(ID, cur, sid, tid, label, properties)
-        else:
-            edge = {'id': ID, 'sid': sid, 'tid': tid, 'label': label, 'properties': properties}
-    except:
-        return psycopg2.InterfaceError('Bad edge representation: %s' % val)
-    return edge
-
-EDGE = psycopg2.extensions.new_type((7022,), 'EDGE', _cast_edge)
+        id_start = val.index('[')
+        id_end = val.index(']', id_start)
+        ends_end = val.index(']', id_end+1)
+        label = val[:id_start]
+        ID = GraphId.parse(val[id_start+1:id_end])
+        sid, tid = val[id_end+2:ends_end].split(',')
+        sid = GraphId.parse(sid)
+        tid = GraphId.parse(tid)
+        if graph is not None and graph.lazy_properties:
+            return GraphEdge(ID, graph, sid, tid, label, raw_properties=val[ends_end+1:])
+        properties = _json_loads(val[ends_end+1:])
+    except ValueError:
+        raise psycopg2.InterfaceError('Bad edge representation: %s' % val)
+    if graph is not None:
+        return GraphEdge(ID, graph, sid, tid, label, properties)
+    return {'id': ID, 'sid': sid, 'tid': tid, 'label': label, 'properties': properties}
+
+EDGE = psycopg2.extensions.new_type((7022,), 'EDGE', _profiled(_cast_edge))
 psycopg2.extensions.register_type(EDGE)
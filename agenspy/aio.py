@@ -0,0 +1,498 @@
+'''
+This module provides AsyncGraph, an asyncio counterpart of agenspy.graph.Graph.
+
+It is built on the asynchronous mode of psycopg2, so no additional dependency
+is needed: queries are sent on non-blocking connections which are polled from
+the event loop. Each AsyncGraph keeps a small pool of such connections, hence
+up to maxconn queries of one AsyncGraph run concurrently:
+
+    > graph = await AsyncGraph.connect('kegg', dbname='test')
+    > tp53, n = await asyncio.gather(graph.subgraph(source_property_filter={'symbol': 'TP53'}),
+    >                                graph.numv('gene'))
+    > await graph.close()
+
+Vertices and edges are cast to agenspy.types.GraphVertex/GraphEdge bound to
+the AsyncGraph. Their labels are resolved from the cached catalog, properties
+which are not cached have to be loaded explicitly via
+AsyncGraph.fetch_properties before accessing them (implicit fetches raise
+a TypeError).
+
+Note that asynchronous psycopg2 connections are always in autocommit mode.
+'''
+
+import asyncio
+import collections
+import getpass
+
+import psycopg2
+import psycopg2.extensions
+
+import agenspy.cursor
+import agenspy.graph
+import agenspy.types
+
+################################################################################
+# helpers ######################################################################
+################################################################################
+
+# Python < 3.7: inside a coroutine the event loop is the running one
+_get_running_loop = getattr(asyncio, 'get_running_loop', asyncio.get_event_loop)
+
+async def _wait(connection):
+    '''
+    Poll an asynchronous connection from the event loop until its
+    current operation is finished.
+    '''
+    loop = _get_running_loop()
+    while True:
+        state = connection.poll()
+        if state == psycopg2.extensions.POLL_OK:
+            return
+        future = loop.create_future()
+
+        def ready():
+            if not future.done():
+                future.set_result(None)
+
+        fd = connection.fileno()
+        if state == psycopg2.extensions.POLL_READ:
+            loop.add_reader(fd, ready)
+            try:
+                await future
+            finally:
+                loop.remove_reader(fd)
+        elif state == psycopg2.extensions.POLL_WRITE:
+            loop.add_writer(fd, ready)
+            try:
+                await future
+            finally:
+                loop.remove_writer(fd)
+        else:
+            raise psycopg2.OperationalError('poll() returned {}'.format(state))
+
+
+class _AsyncCursor(psycopg2.extensions.cursor):
+    '''
+    Cursor on an asynchronous connection of an AsyncGraph. Vertices and
+    edges fetched through it are bound to that graph.
+    '''
+
+    def __init__(self, conn, graph):
+        super().__init__(conn)
+        self.graph = graph
+
+
+class _Acquire:
+    '''
+    async with graph._acquire() as connection: ...
+    '''
+
+    def __init__(self, graph):
+        self._graph = graph
+        self._connection = None
+
+    async def __aenter__(self):
+        if self._graph._semaphore is None:
+            # created lazily, such that it belongs to the running event loop
+            self._graph._semaphore = asyncio.Semaphore(self._graph._maxconn)
+        await self._graph._semaphore.acquire()
+        try:
+            self._connection = await self._graph._getconn()
+        except:
+            self._graph._semaphore.release()
+            raise
+        return self._connection
+
+    async def __aexit__(self, exc_type, exc, traceback):
+        # a connection interrupted mid-query (e.g. cancelled) is not reusable
+        discard = exc_type is not None and not issubclass(exc_type, psycopg2.Error)
+        self._graph._putconn(self._connection, discard)
+        self._graph._semaphore.release()
+
+################################################################################
+# AsyncGraph (class) ###########################################################
+################################################################################
+
+class AsyncGraph:
+
+    def __init__(self,
+                 graph_name,
+                 maxconn=10,
+                 lazy_properties=False,
+                 verbose=False,
+                 host='127.0.0.1',
+                 port='5432',
+                 **kwargs):
+        '''
+        Use AsyncGraph.connect to construct an AsyncGraph: the constructor
+        does not connect, it only sets up an AsyncGraph on which raw
+        queries (AsyncGraph.execute) can be run. Everything relying on the
+        graph id or the catalog raises a RuntimeError until connected.
+
+        Args:
+
+            graph_name (str): name of the graph
+            maxconn (int): maximum number of concurrent connections/queries
+            lazy_properties (bool): see agenspy.graph.Graph
+            verbose (bool): print executed queries
+            host (str): database host
+            port (str): database port
+
+        All other kwargs will be passed to psycopg2.connect.
+        '''
+        self._name = graph_name
+        self._maxconn = maxconn
+        self.lazy_properties = lazy_properties
+        self.verbose = verbose
+        self._connect_kwargs = dict(host=host, port=port, **kwargs)
+        self._idle = []
+        self._semaphore = None
+        self._graphid = None
+        self._vertex_table = None
+        self._catalog = {}
+
+    @classmethod
+    async def connect(cls, graph_name, authorization=None, replace=False, **kwargs):
+        '''
+        Open an AsyncGraph, creating the graph if it does not exist.
+
+        Args:
+
+            graph_name (str): name of the graph
+            authorization (str): owner of the graph, defaults to the user
+            replace (bool): drop an existing graph of the same name first
+
+        All other kwargs are passed to AsyncGraph.
+
+        Returns:
+
+            AsyncGraph
+        '''
+        graph = cls(graph_name, **kwargs)
+        user = graph._connect_kwargs.get('user', getpass.getuser())
+        authorization = user if authorization is None else authorization
+        async with graph._acquire() as connection:
+            graph._vertex_table = '{}.ag_vertex'.format(
+                psycopg2.extensions.quote_ident(graph_name.lower(), connection))
+        if replace:
+            await graph.execute(agenspy.cursor.Cursor._drop_graph(graph_name, if_exists=True)+';')
+        await graph.execute(agenspy.cursor.Cursor._create_graph(graph_name,
+                                                                if_not_exists=True,
+                                                                authorization=authorization)+';')
+        rows = await graph.execute(agenspy.graph.Graph._graph_id_query(graph_name))
+        graph._graphid = rows[0][0] + 1
+        await graph.refresh_catalog()
+        return graph
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def graphid(self):
+        self._check_connected()
+        return self._graphid
+
+    def _check_connected(self):
+        if self._graphid is None:
+            raise RuntimeError('AsyncGraph {} is not connected, use await AsyncGraph.connect(...).'
+                               .format(self._name))
+
+    ############################################################################
+    # connections ##############################################################
+    ############################################################################
+
+    def _acquire(self):
+        return _Acquire(self)
+
+    async def _getconn(self):
+        if self._idle:
+            return self._idle.pop()
+        connection = psycopg2.connect(async_=True, **self._connect_kwargs)
+        await _wait(connection)
+        cursor = connection.cursor()
+        cursor.execute('SET graph_path = {};'.format(self._name))
+        await _wait(connection)
+        cursor.close()
+        return connection
+
+    def _putconn(self, connection, discard=False):
+        if discard or connection.closed:
+            connection.close()
+        else:
+            self._idle.append(connection)
+
+    async def close(self):
+        '''
+        Close all idle connections.
+        '''
+        while self._idle:
+            self._idle.pop().close()
+
+    ############################################################################
+    # execute ##################################################################
+    ############################################################################
+
+    async def execute(self, query, args=None):
+        '''
+        Execute a query on one of the pooled connections.
+
+        Args:
+
+            query (str): the query
+            args: query arguments, see psycopg2's cursor.execute
+
+        Returns:
+
+            list: the result rows, None for queries without result
+        '''
+        async with self._acquire() as connection:
+            cursor = _AsyncCursor(connection, self)
+            try:
+                cursor.execute(query, args)
+                await _wait(connection)
+                if self.verbose:
+                    print(query)
+                return cursor.fetchall() if cursor.description is not None else None
+            finally:
+                cursor.close()
+
+    async def _execute_ddl(self, query):
+        await self.execute(query+';')
+        await self.refresh_catalog()
+
+    ############################################################################
+    # catalog ##################################################################
+    ############################################################################
+
+    async def refresh_catalog(self):
+        '''
+        (Re)load the labels of the graph.
+        '''
+        labels = await self.execute(agenspy.graph.Graph._catalog_labels_query(self.graphid))
+        self._catalog = {'labels': labels,
+                         'label_names': {labid: labname for labid, _, labname, _ in labels}}
+        return self
+
+    def invalidate_catalog(self):
+        self._catalog = {}
+        return self
+
+    async def _catalog_labels(self):
+        if 'labels' not in self._catalog:
+            await self.refresh_catalog()
+        return self._catalog['labels']
+
+    def label_of(self, ID):
+        '''
+        Label of the vertex or edge with the given graphid, resolved from the
+        cached catalog (see Graph.label_of). Call refresh_catalog after
+        labels were created outside of this AsyncGraph.
+        '''
+        return self._catalog.get('label_names', {}).get(agenspy.types.GraphId.of(ID).oid)
+
+    async def _note_label(self, label, x):
+        if label and label not in await self.xlabels(x):
+            await self.refresh_catalog()
+
+    async def xlabels(self, x):
+        return [labname for _, _, labname, labkind in await self._catalog_labels() if labkind == x]
+
+    @property
+    def vlabels(self):
+        return self.xlabels('v')
+
+    @property
+    def elabels(self):
+        return self.xlabels('e')
+
+    async def _get_xlabel_inheritance(self, x):
+        key = ('inheritance', x)
+        if key not in self._catalog:
+            relid2name = {relid: labname for _, relid, labname, labkind
+                          in await self._catalog_labels() if labkind == x}
+            rows = await self.execute(agenspy.graph.Graph._xlabel_inheritance_query(x, self.graphid))
+            self._catalog[key] = [(relid2name[p], relid2name[c]) for p, c in rows]
+        return list(self._catalog[key])
+
+    @property
+    def vlabel_inheritance(self):
+        return self._get_xlabel_inheritance('v')
+
+    @property
+    def elabel_inheritance(self):
+        return self._get_xlabel_inheritance('e')
+
+    ############################################################################
+    # DDL ######################################################################
+    ############################################################################
+
+    async def create_vlabel(self, name, **kwargs):
+        '''
+        See agenspy.cursor.Cursor.create_vlabel.
+        '''
+        await self._execute_ddl(agenspy.cursor.Cursor._create_xlabel('V', name, **kwargs))
+        return self
+
+    async def create_elabel(self, name, **kwargs):
+        '''
+        See agenspy.cursor.Cursor.create_elabel.
+        '''
+        await self._execute_ddl(agenspy.cursor.Cursor._create_xlabel('E', name, **kwargs))
+        return self
+
+    async def drop_vlabel(self, name, cascade=False, if_exists=False):
+        '''
+        See agenspy.cursor.Cursor.drop_vlabel.
+        '''
+        await self._execute_ddl(agenspy.cursor.Cursor._drop_xlabel('V', name, if_exists, cascade))
+        return self
+
+    async def drop_elabel(self, name, cascade=False, if_exists=False):
+        '''
+        See agenspy.cursor.Cursor.drop_elabel.
+        '''
+        await self._execute_ddl(agenspy.cursor.Cursor._drop_xlabel('E', name, if_exists, cascade))
+        return self
+
+    async def create_property_index(self, label_name, attr_expr, expr=None, **kwargs):
+        '''
+        See agenspy.cursor.Cursor.create_property_index.
+        '''
+        await self._execute_ddl(agenspy.cursor.Cursor._create_property_index(label_name,
+                                                                             attr_expr,
+                                                                             expr,
+                                                                             **kwargs))
+        return self
+
+    async def create_unique_constraint(self, constraint_name, label_name, field_expr):
+        '''
+        See agenspy.cursor.Cursor.create_unique_constraint.
+        '''
+        await self._execute_ddl(agenspy.cursor.Cursor._create_unique_constraint(constraint_name,
+                                                                                label_name,
+                                                                                field_expr))
+        return self
+
+    ############################################################################
+    # nodes and edges ##########################################################
+    ############################################################################
+
+    @property
+    def nv(self):
+        return self._count('MATCH (v) RETURN count(v);')
+
+    @property
+    def ne(self):
+        return self._count('MATCH ()-[e]->() RETURN count(e);')
+
+    async def _count(self, query):
+        return (await self.execute(query))[0][0]
+
+    async def numv(self, label=None, prop={}, where=None):
+        '''
+        See agenspy.graph.Graph.numv.
+        '''
+        return await self._count(agenspy.graph.Graph._numv(label, prop, where))
+
+    async def create_node(self, label=None, properties={}, **kwargs):
+        '''
+        See agenspy.graph.Graph.create_node.
+        '''
+        properties = { **properties, **kwargs }
+        rows = await self.execute(agenspy.graph.Graph._create_node(label, properties))
+        await self._note_label(label, 'v')
+        return agenspy.types.GraphVertex(rows[0][0], self, label, properties)
+
+    async def create_edge(self, source, relation=None, target=None, properties={}, **kwargs):
+        '''
+        See agenspy.graph.Graph.create_edge.
+        '''
+        properties = { **properties, **kwargs }
+        rows = await self.execute(agenspy.graph.Graph._create_edge(source, relation, target, properties))
+        await self._note_label(relation, 'e')
+        target = source if target is None else target
+        return agenspy.types.GraphEdge(rows[0][0], self, source.id, target.id, relation, properties)
+
+    async def create_self_loop(self, node, relation=None, properties={}, **kwargs):
+        '''
+        See agenspy.graph.Graph.create_self_loop.
+        '''
+        return await self.create_edge(node, relation, None, properties, **kwargs)
+
+    async def fetch_properties(self, entities, keys=None, chunk_size=10000):
+        '''
+        See agenspy.graph.Graph.fetch_properties.
+        '''
+        if keys is not None:
+            keys = list(keys)
+        vertices = collections.defaultdict(list)
+        edges = collections.defaultdict(list)
+        for entity in entities:
+            if isinstance(entity, agenspy.types.GraphEdge):
+                edges[entity.id].append(entity)
+            else:
+                vertices[entity.id].append(entity)
+        self._check_connected()
+        schema = self._vertex_table.rsplit('.', 1)[0]
+        requests = []
+        for table, id2entities in (('ag_vertex', vertices), ('ag_edge', edges)):
+            query = agenspy.graph.Graph._fetch_properties_query('{}.{}'.format(schema, table), keys)
+            ids = list(id2entities)
+            for offset in range(0, len(ids), chunk_size):
+                chunk = ids[offset:offset+chunk_size]
+                requests.append(self.execute(query, (chunk,) if keys is None else (keys, chunk)))
+        for rows in await asyncio.gather(*requests):
+            for ID, properties in rows:
+                for entity in vertices.get(ID, []) + edges.get(ID, []):
+                    entity._cache_properties({} if properties is None else properties, keys)
+        return self
+
+    ############################################################################
+    # subgraph #################################################################
+    ############################################################################
+
+    async def subgraph(self,
+                       source_label=None,
+                       source_property_filter=None,
+                       source_property_proj=None,
+                       edge_label=None,
+                       edge_property_filter=None,
+                       edge_property_proj=None,
+                       target_label=None,
+                       target_property_filter=None,
+                       target_properties=None,
+                       where_clause=None,
+                       conjunctive=True,
+                       chunk_size=10000):
+        '''
+        See agenspy.graph.Graph.subgraph. The endpoint chunks are fetched
+        concurrently.
+        '''
+        rows = await self.execute(agenspy.graph.Graph._subgraph_query(source_label,
+                                                                      source_property_filter,
+                                                                      edge_label,
+                                                                      edge_property_filter,
+                                                                      edge_property_proj,
+                                                                      target_label,
+                                                                      target_property_filter,
+                                                                      where_clause,
+                                                                      conjunctive))
+        edges = [agenspy.types.GraphEdge(ID=edge[0],
+                                         graph=self,
+                                         sid=edge[1],
+                                         tid=edge[2],
+                                         label=edge[3],
+                                         properties=edge[4])
+                 for edge in rows]
+        node_ids = list({ edge.sid for edge in edges } | { edge.tid for edge in edges })
+        self._check_connected()
+        query = agenspy.graph.Graph._match_vertices_query(self._vertex_table)
+        results = await asyncio.gather(*[self.execute(query, (node_ids[offset:offset+chunk_size],))
+                                         for offset in range(0, len(node_ids), chunk_size)])
+        nodes = [agenspy.types.GraphVertex(ID=node[0],
+                                           graph=self,
+                                           label=node[1],
+                                           properties=node[2])
+                 for rows in results for node in rows]
+        return agenspy.graph.Subgraph(nodes, edges, normalized=True)
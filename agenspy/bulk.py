@@ -0,0 +1,205 @@
+'''
+This module provides BulkLoadMode, the PostgreSQL fast-load recipe for labels
+of a Graph: record the indexes and constraints of the labels, drop (or
+disable) them, optionally switch the labels to UNLOGGED, load, then switch
+back to LOGGED and rebuild the indexes and constraints (optionally
+CONCURRENTLY and in parallel), see Graph.bulk_load_mode:
+
+    > with graph.bulk_load_mode(vlabels=['gene'], elabels=['interacts'], workers=4):
+    >     graph.create_from_igraph(G, node_label='gene', edge_label='interacts', bulk=True)
+'''
+
+import collections
+import concurrent.futures
+
+import psycopg2.extensions
+
+################################################################################
+# IndexDefinition (class) ######################################################
+################################################################################
+
+class IndexDefinition(collections.namedtuple('IndexDefinition',
+                                             ['table', 'name', 'definition', 'constraint'])):
+    '''
+    An index of a label table as recorded by BulkLoadMode. For indexes
+    backing a constraint (e.g. unique constraints) constraint is the
+    (name, definition) of the constraint, None otherwise.
+    '''
+
+    def drop(self):
+        if self.constraint is not None:
+            return 'ALTER TABLE {} DROP CONSTRAINT {};'.format(self.table, self.constraint[0])
+        return 'DROP INDEX {};'.format(self.name)
+
+    def create(self, concurrently=False):
+        if self.constraint is not None:
+            return 'ALTER TABLE {} ADD CONSTRAINT {} {};'.format(self.table, *self.constraint)
+        if concurrently:
+            return self.definition.replace(' INDEX ', ' INDEX CONCURRENTLY ', 1)+';'
+        return self.definition+';'
+
+################################################################################
+# BulkLoadMode (class) #########################################################
+################################################################################
+
+class BulkLoadMode:
+
+    def __init__(self,
+                 graph,
+                 vlabels=(),
+                 elabels=(),
+                 strategy='drop',
+                 unlogged=False,
+                 concurrently=False,
+                 workers=1,
+                 system_indexes=False):
+        '''
+        Use Graph.bulk_load_mode to construct a BulkLoadMode.
+
+        Args:
+
+            graph (agenspy.graph.Graph): the graph
+            vlabels (list): vertex labels to be loaded
+            elabels (list): edge labels to be loaded
+            strategy (str): 'drop' drops the indexes and constraints and
+                            recreates them from their recorded definitions,
+                            'disable' uses ALTER {V,E}LABEL ... DISABLE INDEX
+                            and rebuilds with REINDEX. Default: 'drop'
+            unlogged (bool): SET UNLOGGED during the load, SET LOGGED after.
+                             Unlogged labels are not crash-safe. Default: False
+            concurrently (bool): recreate indexes with CREATE INDEX
+                                 CONCURRENTLY (strategy 'drop' only).
+                                 Default: False
+            workers (int): number of connections rebuilding indexes in
+                           parallel. Default: 1
+            system_indexes (bool): include the indexes on id, start and end
+                                   of the label tables (strategy 'drop'
+                                   only, the primary key is always kept).
+                                   Default: False
+        '''
+        assert strategy in ('drop', 'disable'), "strategy has to be 'drop' or 'disable'."
+        self._graph = graph
+        self._labels = [(label, 'v') for label in vlabels] + [(label, 'e') for label in elabels]
+        self.strategy = strategy
+        self.unlogged = unlogged
+        self.concurrently = concurrently
+        self.workers = workers
+        self.system_indexes = system_indexes
+        self.indexes = []
+        self._tables = []
+
+    def __enter__(self):
+        return self.suspend()
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self._graph.commit()
+        else:
+            self._graph.rollback()
+        self.restore()
+
+    def suspend(self):
+        '''
+        Record and drop (or disable) the indexes and constraints of the
+        labels, SET UNLOGGED if requested and commit, so that parallel
+        loaders are not blocked.
+
+        Returns:
+
+            BulkLoadMode
+        '''
+        graph = self._graph
+        for label, x in self._labels:
+            graph._ensure_xlabel(label, x)
+            table = graph._xlabel_table(label)
+            self._tables.append((label, x, table))
+            if self.strategy == 'drop':
+                indexes = self._record_indexes(table)
+                for index in indexes:
+                    graph.execute(index.drop())
+                self.indexes.extend(indexes)
+            else:
+                self._alter_xlabel(label, x).disable_index()
+            if self.unlogged:
+                self._alter_xlabel(label, x).set_unlogged()
+        graph.commit()
+        return self
+
+    def restore(self):
+        '''
+        Commit the load, SET LOGGED if the labels were set UNLOGGED and
+        rebuild the indexes and constraints.
+
+        Returns:
+
+            BulkLoadMode
+        '''
+        graph = self._graph
+        # the rebuild runs in autocommit mode or on other connections which
+        # would wait for the locks of the loading transaction
+        graph.commit()
+        if self.unlogged:
+            for label, x, _ in self._tables:
+                self._alter_xlabel(label, x).set_logged()
+            graph.commit()
+        if self.strategy == 'drop':
+            statements = [index.create(self.concurrently) for index in self.indexes]
+        else:
+            statements = ['REINDEX TABLE {};'.format(table) for _, _, table in self._tables]
+        self._run(statements)
+        graph.invalidate_catalog()
+        self.indexes = []
+        self._tables = []
+        return self
+
+    def _alter_xlabel(self, label, x):
+        alter_xlabel = self._graph.alter_vlabel if x == 'v' else self._graph.alter_elabel
+        return alter_xlabel(psycopg2.extensions.quote_ident(label, self._graph))
+
+    def _record_indexes(self, table):
+        query = ['SELECT indexes.indexrelid::regclass::text,',
+                 'pg_get_indexdef(indexes.indexrelid),',
+                 'quote_ident(constraints.conname),',
+                 'pg_get_constraintdef(constraints.oid)',
+                 'FROM pg_catalog.pg_index AS indexes',
+                 'LEFT JOIN pg_catalog.pg_constraint AS constraints',
+                 'ON constraints.conindid = indexes.indexrelid AND constraints.conrelid = indexes.indrelid',
+                 'WHERE indexes.indrelid = %s::regclass AND NOT indexes.indisprimary']
+        if not self.system_indexes:
+            query.append("AND NOT (indexes.indnatts = 1 AND "+\
+                         "pg_get_indexdef(indexes.indexrelid, 1, false) IN ('id', 'start', '\"end\"', 'end'))")
+        self._graph.execute(' '.join(query)+';', (table,))
+        return [IndexDefinition(table, name, definition, None if conname is None else (conname, condef))
+                for name, definition, conname, condef in self._graph.fetchall()]
+
+    def _run(self, statements):
+        '''
+        Run statements in autocommit mode, on the connection of the graph
+        or on workers connections in parallel.
+        '''
+        if not statements:
+            return
+        graph = self._graph
+        if self.workers <= 1:
+            autocommit = graph.connection.autocommit
+            graph.connection.autocommit = True
+            try:
+                for statement in statements:
+                    graph.execute(statement)
+            finally:
+                graph.connection.autocommit = autocommit
+            return
+
+        def run(statement):
+            connection = graph._worker_connection()
+            try:
+                connection.autocommit = True
+                with connection.cursor() as cursor:
+                    cursor.execute(statement)
+            finally:
+                connection.autocommit = False
+                graph._release_worker_connection(connection)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for future in [executor.submit(run, statement) for statement in statements]:
+                future.result()
@@ -9,11 +9,18 @@ More information on the DDL can be obtained here:
     http://bitnine.net/wp-content/uploads/2017/06/html5/main.html#data-definition-language
 '''
 
+import collections
 import functools
+import itertools
+import random
+import time
+import weakref
 
 import psycopg2
 import psycopg2.extensions
 
+from agenspy.profiling import normalize_query
+
 ################################################################################
 # execute (decorator) ##########################################################
 ################################################################################
@@ -23,6 +30,7 @@ def execute(query_builder):
     Decorator for cursor methods which talk to the database.
     The decorated methods are supposed to just return a string
     with the query/command for the database server.
+    As these are DDL commands, cached catalog data is invalidated.
 
     Args:
 
@@ -36,34 +44,162 @@ def execute(query_builder):
     @functools.wraps(query_builder)
     def _execute(self, *args, **kwargs):
         query = query_builder(self, *args, **kwargs) + ';'
+        started = time.time()
         super(Cursor, self).execute(query)
-        self.history.append(query)
+        self._log_query(query, started)
+        self._catalog_changed()
         if self.verbose:
             print(query)
         return self
 
     return _execute
 
+################################################################################
+# prepared statements ##########################################################
+################################################################################
+
+# Prepared statements live as long as the server session, i.e. the connection.
+_prepared_statements = weakref.WeakKeyDictionary()   # connection --> {(query, types): name}
+_prepared_statement_ids = itertools.count()
+
+################################################################################
+# query history ################################################################
+################################################################################
+
+class QueryRecord(collections.namedtuple('QueryRecord', ['query', 'started', 'seconds'])):
+    '''
+    Entry of Cursor.history: the query, its start (as time.time())
+    and its execution time in seconds.
+    '''
+
+    def __str__(self):
+        return self.query
+
 ################################################################################
 # AgensCursor (class) ##########################################################
 ################################################################################
 
 class Cursor(psycopg2.extensions.cursor):
-    history = []
+    # defaults for new cursors, see Cursor.configure_history
+    history_size = 1000
+    history_sample = 1.0
+    # default agenspy.profiling.Profiler of new cursors, see Cursor.set_profiler
+    profiler = None
 
-    def __init__(self, conn, name=None, verbose=False):
+    def __init__(self, conn, name=None, verbose=False, pool=None):
         '''
         Args:
 
             conn (psycopg2.connection): a psycopg2 connection to the AgensGraph DB
             name (str): name of cursor
+            verbose (bool): print executed commands
+            pool (agenspy.pool.GraphPool): pool conn was taken from, it is
+                                           returned there on close
         '''
         super().__init__(conn, name)
         self.verbose = verbose
+        self._pool = pool
+        self.configure_history(self.history_size, self.history_sample)
+        self._profile_event = None
+        self._profile_template = None
         self.alter_graph = self.AlterGraph(self)
         self.alter_vlabel = self.AlterXLabel(self, 'V')
         self.alter_elabel = self.AlterXLabel(self, 'E')
 
+    def _catalog_changed(self):
+        '''
+        Hook called after DDL commands, see Graph.invalidate_catalog.
+        '''
+        pass
+
+    ############################################################################
+    # history ##################################################################
+    ############################################################################
+
+    def configure_history(self, size=1000, sample=1.0):
+        '''
+        Configure the query history of the cursor, a ring buffer of
+        QueryRecord entries holding the last size recorded queries.
+        The class attributes Cursor.history_size and Cursor.history_sample
+        are the defaults for new cursors.
+
+        Args:
+
+            size (int): maximum number of entries, 0 switches the history
+                        off, None makes it unbounded. Default: 1000
+            sample (float): fraction of queries recorded. Default: 1.0
+
+        Returns:
+
+            Cursor
+        '''
+        self.history = collections.deque(maxlen=size)
+        self._history_sample = sample
+        return self
+
+    def _log_query(self, query, started, cursor=None):
+        '''
+        Record a query executed since started (time.time()) in the history
+        and pass it to the profiler. cursor is the cursor which executed
+        the query if not this one (e.g. a server-side cursor).
+        '''
+        seconds = time.time() - started
+        history = self.history
+        if history.maxlen != 0:
+            if self._history_sample >= 1.0 or random.random() < self._history_sample:
+                history.append(QueryRecord(query, started, seconds))
+        if self.profiler is not None:
+            self._profile_query(query, started, seconds, self if cursor is None else cursor)
+
+    ############################################################################
+    # profiling ################################################################
+    ############################################################################
+
+    def set_profiler(self, profiler):
+        '''
+        Instrument the queries of this cursor, see agenspy.profiling.
+        Setting the class attribute Cursor.profiler instruments all cursors
+        (without an own profiler).
+
+        Args:
+
+            profiler (agenspy.profiling.Profiler): the profiler, None to
+                                                   switch profiling off
+
+        Returns:
+
+            Cursor
+        '''
+        self.flush_profile()
+        self.profiler = profiler
+        return self
+
+    def flush_profile(self):
+        '''
+        Pass the measurements of the last query to the profiler. This is
+        done automatically by the next query and on close.
+        '''
+        event = self._profile_event
+        if event is not None:
+            self._profile_event = None
+            self.profiler._finish(event)
+        return self
+
+    def _profile_query(self, query, started, seconds, cursor):
+        self.flush_profile()
+        template = self._profile_template or normalize_query(query)
+        self._profile_template = None
+        event = self.profiler._start(cursor,
+                                     query if cursor.query is None else cursor.query,
+                                     template,
+                                     started,
+                                     seconds)
+        if cursor.description is None and cursor.name is None:
+            self.profiler._finish(event)
+        else:
+            # completed with the decoding of the result, see agenspy.profiling
+            self._profile_event = event
+
     @classmethod
     def _sql_string_list(cls, l):
         return '('+', '.join(l)+')'
@@ -345,9 +481,9 @@ class Cursor(psycopg2.extensions.cursor):
         cmd = ['CREATE']
         if unlogged:
             cmd.append('UNLOGGED')
+        cmd.append(x+'LABEL')
         if if_not_exists:
             cmd.append('IF NOT EXISTS')
-        cmd.append(x+'LABEL')
         cmd.append(name)
         if disable_index:
             cmd.append('DISABLE INDEX')
@@ -566,7 +702,7 @@ class Cursor(psycopg2.extensions.cursor):
     ############################################################################
 
     @execute
-    def drop_vlabel(self, name, cascade=False):
+    def drop_vlabel(self, name, cascade=False, if_exists=False):
         '''
         Drop a node label.
 
@@ -583,7 +719,7 @@ class Cursor(psycopg2.extensions.cursor):
 
             Cursor
         '''
-        return self._drop_xlabel('V', name, cascade)
+        return self._drop_xlabel('V', name, if_exists, cascade)
 
     ############################################################################
     # create_elabel (method) ###################################################
@@ -650,7 +786,7 @@ class Cursor(psycopg2.extensions.cursor):
     ############################################################################
 
     @execute
-    def drop_elabel(self, name, cascade=False):
+    def drop_elabel(self, name, cascade=False, if_exists=False):
         '''
         Drop an edge label.
 
@@ -667,7 +803,7 @@ class Cursor(psycopg2.extensions.cursor):
 
             Cursor
         '''
-        return self._drop_xlabel('E', name, cascade)
+        return self._drop_xlabel('E', name, if_exists, cascade)
 
     ############################################################################
     # create_property_index (method) ###########################################
@@ -840,14 +976,89 @@ class Cursor(psycopg2.extensions.cursor):
     # execute (method) #########################################################
     ############################################################################
 
-    def execute(self, cmd):
+    def execute(self, cmd, args=None):
         if isinstance(cmd, list):
             for c in cmd:
-                super().execute(c)
-            history.extend(cmd)
+                started = time.time()
+                super().execute(c, args)
+                self._log_query(c, started)
         else:
-            super().execute(cmd)
-            self.history.append(cmd)
+            started = time.time()
+            super().execute(cmd, args)
+            self._log_query(cmd, started)
+        return self
+
+    ############################################################################
+    # prepared statements (methods) ############################################
+    ############################################################################
+
+    def prepare(self, query, types=()):
+        '''
+        Prepare a statement on the server, once per connection and shape.
+
+        PREPARE agenspy_<n> [ (type [, ...]) ] AS query;
+
+        Args:
+
+            query (str): statement with parameters $1, $2, ...
+            types (tuple): parameter types, e.g. ('graphid', 'jsonb')
+
+        Returns:
+
+            str: name of the prepared statement
+        '''
+        types = tuple(types)
+        statements = _prepared_statements.setdefault(self.connection, {})
+        name = statements.get((query, types))
+        if name is None:
+            name = 'agenspy_{}'.format(next(_prepared_statement_ids))
+            cmd = ['PREPARE', name]
+            if types:
+                cmd.append(self._sql_string_list(types))
+            cmd.append('AS')
+            cmd.append(query.strip().rstrip(';')+';')
+            self.execute(' '.join(cmd))
+            statements[(query, types)] = name
+        return name
+
+    def execute_prepared(self, query, args=(), types=()):
+        '''
+        Execute query as prepared statement (see Cursor.prepare), args are
+        sent as bound parameters. The statement is parsed and planned by the
+        server only once per connection instead of on every call.
+
+        EXECUTE agenspy_<n> [ (arg [, ...]) ];
+
+        Args:
+
+            query (str): statement with parameters $1, $2, ...
+            args (tuple): parameter values
+            types (tuple): parameter types
+
+        Returns:
+
+            Cursor
+        '''
+        name = self.prepare(query, types)
+        self._profile_template = normalize_query(query) if self.profiler is not None else None
+        try:
+            if args:
+                return self.execute('EXECUTE {}{};'.format(name, self._sql_string_list(len(args)*['%s'])),
+                                    tuple(args))
+            return self.execute('EXECUTE {};'.format(name))
+        finally:
+            self._profile_template = None
+
+    def deallocate_prepared(self):
+        '''
+        DEALLOCATE ALL prepared statements of the connection.
+
+        Returns:
+
+            Cursor
+        '''
+        self.execute('DEALLOCATE ALL;')
+        _prepared_statements.pop(self.connection, None)
         return self
 
     ############################################################################
@@ -855,8 +1066,19 @@ class Cursor(psycopg2.extensions.cursor):
     ############################################################################
 
     def close(self, close_connection=False):
+        '''
+        Close the cursor. A pooled connection is returned to its pool
+        (and closed there if close_connection), any other connection is
+        only closed if close_connection is True.
+        '''
+        if self.closed:
+            return
+        if self.profiler is not None:
+            self.flush_profile()
         super().close()
-        if close_connection and self.connection:
+        if self._pool is not None:
+            self._pool.putconn(self.connection, close=close_connection)
+        elif close_connection and self.connection:
             self.connection.close()
 
     ############################################################################
@@ -1,11 +1,240 @@
+import array
+import collections
+import collections.abc
 import getpass
+import itertools
+import json
+import math
+import numbers
 import re
+import time
 
 import psycopg2
+import psycopg2.extensions
+import psycopg2.extras
 
+import agenspy.bulk
 import agenspy.cursor
+import agenspy.parallel
 import agenspy.types
 
+################################################################################
+# bulk loading helpers #########################################################
+################################################################################
+
+class BulkLoadReport(collections.namedtuple('BulkLoadReport',
+                                            ['nodes', 'edges', 'seconds'])):
+    '''
+    Summary of a bulk load, see Graph.create_from_igraph(..., bulk=True).
+    '''
+
+    @property
+    def rows(self):
+        return self.nodes + self.edges
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds > 0 else float('inf')
+
+    def __str__(self):
+        return '{} nodes, {} edges in {:.2f} seconds ({:.0f} rows/sec)'\
+               .format(self.nodes, self.edges, self.seconds, self.rows_per_second)
+
+
+def _properties_json(properties):
+    '''
+    Serialize a property dict to JSON, dropping None and NaN values
+    (setting a property to null removes it in Cypher as well).
+    '''
+    return json.dumps({key: value for key, value in properties.items()
+                       if value is not None and not (isinstance(value, numbers.Real) and value != value)},
+                      default=_json_default)
+
+
+def _json_default(value):
+    '''
+    JSON serializable equivalent of numpy scalars (e.g. numpy.int64,
+    numpy.bool_) and arrays, which are common attribute values of igraph
+    graphs built from numpy data.
+    '''
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    raise TypeError('Object of type {} is not JSON serializable'.format(type(value).__name__))
+
+
+def _cypher_literal(value):
+    '''
+    Python value --> Cypher literal, e.g. {'name': "O'Neil"} --> {'name': 'O''Neil'}
+    '''
+    if value is None:
+        return 'null'
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, numbers.Real):
+        if not isinstance(value, numbers.Integral) and not math.isfinite(value):
+            raise ValueError('{} has no Cypher literal.'.format(value))
+        return str(value)
+    if isinstance(value, dict):
+        return '{'+', '.join('{}: {}'.format(_cypher_literal(str(key)), _cypher_literal(item))
+                             for key, item in value.items())+'}'
+    if isinstance(value, (list, tuple)):
+        return '['+', '.join(_cypher_literal(item) for item in value)+']'
+    return "'{}'".format(str(value).replace("'", "''"))
+
+
+def _copy_escape(text):
+    '''
+    Escape a value for the PostgreSQL COPY text format. JSON produced by
+    json.dumps contains no raw control characters, only backslashes.
+    '''
+    return text.replace('\\', '\\\\')
+
+
+def _node_copy_rows(ids, indices, attrs, properties):
+    '''
+    COPY text format lines (id, properties) of the nodes at indices.
+    '''
+    for index, ID in zip(indices, ids):
+        yield '{}\t{}\n'.format(ID, _copy_escape(_properties_json(dict(zip(attrs, properties[index])))))
+
+
+def _edge_copy_rows(ids, indices, node_ids, edge_list, attrs, properties):
+    '''
+    COPY text format lines ([id,] start, end, properties) of the edges at
+    indices, without id column if ids are None.
+    '''
+    for index, ID in zip(indices, ids):
+        source, target = edge_list[index]
+        row = '{}\t{}\t{}\n'.format(node_ids[source],
+                                     node_ids[target],
+                                     _copy_escape(_properties_json(dict(zip(attrs, properties[index])))))
+        yield row if ID is None else '{}\t{}'.format(ID, row)
+
+
+def _group_indices(keys):
+    '''
+    ['a', 'b', 'a'] --> OrderedDict([('a', [0, 2]), ('b', [1])])
+    '''
+    groups = collections.OrderedDict()
+    for index, key in enumerate(keys):
+        groups.setdefault(key, []).append(index)
+    return groups
+
+
+def _label_and_property_columns(entities, with_properties=True):
+    '''
+    Labels and (if with_properties) one column per cached property key of
+    the given entities, collected in a single pass. Missing values are None.
+    '''
+    labels = []
+    columns = {}
+    for index, entity in enumerate(entities):
+        labels.append(entity.label)
+        if not with_properties:
+            continue
+        for key, value in entity.items():
+            column = columns.get(key)
+            if column is None:
+                column = columns[key] = []
+            if len(column) < index:
+                column.extend((index-len(column))*[None])
+            column.append(value)
+    n = len(labels)
+    for column in columns.values():
+        if len(column) < n:
+            column.extend((n-len(column))*[None])
+    return labels, columns
+
+
+def _networkx_attributes(entity, label_attr, prefix, expand, copy=True):
+    '''
+    The attribute dict of a node or edge of a networkx graph, see
+    Subgraph.to_networkx.
+    '''
+    attributes = {label_attr: entity.label}
+    if expand:
+        for key, value in entity.items():
+            attributes[prefix+key] = value
+    elif copy:
+        attributes[prefix+'properties'] = dict(entity)
+    else:
+        entity._decode()
+        attributes[prefix+'properties'] = entity
+    return attributes
+
+
+def _networkit_graph(n, sources, targets, weights=None, directed=True):
+    '''
+    NetworKit graph with n nodes from coordinate (COO) arrays of edge source
+    and target indices and (if not None) edge weights.
+    '''
+  # ---------------------- #
+    import networkit as nk
+    import numpy as np
+  # ---------------------- #
+    edges = (np.asarray(sources, dtype=np.uint64), np.asarray(targets, dtype=np.uint64))
+    if weights is None:
+        return nk.graph.GraphFromCoo(edges, n=n, weighted=False, directed=directed)
+    return nk.graph.GraphFromCoo((np.asarray(weights, dtype=np.float64), edges),
+                                 n=n, weighted=True, directed=directed)
+
+
+def _weight(value, default):
+    return default if value is None else value
+
+
+def _graphid_of(entity):
+    '''
+    GraphVertex/GraphEdge or graphid (GraphId, str, numpy.str_, ...) --> GraphId
+    '''
+    if isinstance(entity, agenspy.types.GraphEntity):
+        return entity.id
+    return agenspy.types.GraphId.of(entity)
+
+
+class _CopyStream:
+    '''
+    File-like object feeding lines to cursor.copy_expert without
+    materializing the whole COPY payload in memory.
+    '''
+
+    def __init__(self, lines):
+        self._lines = iter(lines)
+        self._buffer = ''
+
+    def read(self, size=-1):
+        chunks = [self._buffer]
+        n = len(self._buffer)
+        while size < 0 or n < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            chunks.append(line)
+            n += len(line)
+        data = ''.join(chunks)
+        if size < 0:
+            self._buffer = ''
+            return data
+        self._buffer = data[size:]
+        return data[:size]
+
+################################################################################
+# _ServerCursor (class) ########################################################
+################################################################################
+
+_server_cursor_ids = itertools.count()
+
+class _ServerCursor(psycopg2.extensions.cursor):
+    '''
+    Named (server-side) cursor on the connection of a Graph. Vertices and
+    edges fetched through it are cast to GraphVertex/GraphEdge instances
+    bound to that graph.
+    '''
+
+    def __init__(self, conn, name, graph):
+        super().__init__(conn, name)
+        self.graph = graph
+
 ################################################################################
 # Graph (class) ################################################################
 ################################################################################
@@ -23,27 +252,70 @@ class Graph(agenspy.cursor.Cursor):
                  host='127.0.0.1',
                  port='5432',
                  getpass_passwd=False,
+                 lazy_properties=False,
+                 connection=None,
+                 pool=None,
                  **kwargs):
         '''
+        Args:
 
+            graph_name (str): name of the graph (created if it does not exist)
+            authorization (str): owner of the graph, defaults to the user
+            cursor_name (str): name of the cursor
+            replace (bool): drop an existing graph of the same name first
+            host (str): database host
+            port (str): database port
+            getpass_passwd (bool): currently unused
+            lazy_properties (bool): if True, vertices and edges returned by
+                                    queries keep their properties as JSON
+                                    text which is only decoded on first
+                                    access of the properties. Default: False
+            connection (psycopg2.connection): use this connection instead of
+                                              connecting with host, port
+                                              and kwargs
+            pool (agenspy.pool.GraphPool): pool the connection belongs to,
+                                           see GraphPool.graph
+
+        kwargs are passed to psycopg2.connect.
         '''
         if getpass_passwd:
             pass # TODO
-        connection = psycopg2.connect(host=host, port=port, **kwargs)
-        super().__init__(connection, cursor_name)
+        # to open further connections, see Graph._worker_connection
+        self._connect_kwargs = dict(host=host, port=port, **kwargs) if connection is None else None
+        if connection is None:
+            connection = psycopg2.connect(**self._connect_kwargs)
+        super().__init__(connection, cursor_name, pool=pool)
         self._name = graph_name
-        authorization = kwargs.get('user', getpass.getuser()) if authorization is None else authorization
-        if replace:
-            self.drop_graph(graph_name, if_exists=True)
-        self.create_graph(graph_name, if_not_exists=True, authorization=authorization)
-        self._graphid = self._get_graph_id()
-        self.execute('SET graph_path = {};'.format(graph_name))
+        self.lazy_properties = lazy_properties
+        self._catalog = {}
+        self.bulk_load_report = None
+        self._batch = None
+        graphid = pool._get_graphid(graph_name) if pool is not None and not replace else None
+        if graphid is None:
+            authorization = kwargs.get('user', getpass.getuser()) if authorization is None else authorization
+            if replace:
+                self.drop_graph(graph_name, if_exists=True)
+            self.create_graph(graph_name, if_not_exists=True, authorization=authorization)
+            graphid = self._get_graph_id()
+        self._graphid = graphid
+        if pool is None:
+            self.graph_path = graph_name
+        else:
+            # keep graph creation and graph_path beyond the first rollback
+            if pool._get_graph_path(connection) != graph_name:
+                self.graph_path = graph_name
+            self.commit()
+            self._catalog['graph_path'] = graph_name
+            pool._set_graph(connection, graph_name, graphid)
 
     def _get_graph_id(self):
-        self.execute("SELECT nspid FROM pg_catalog.ag_graph WHERE graphname = '{}';"
-                     .format(self.name))
+        self.execute(self._graph_id_query(self.name))
         return self.fetchone()[0] + 1
 
+    @classmethod
+    def _graph_id_query(cls, graph_name):
+        return "SELECT nspid FROM pg_catalog.ag_graph WHERE graphname = '{}';".format(graph_name)
+
     @property
     def name(self):
         return self._name
@@ -54,24 +326,103 @@ class Graph(agenspy.cursor.Cursor):
 
     @property
     def graph_path(self):
-        return self.execute('SHOW graph_path;').fetchone()[0]
+        graph_path = self._catalog.get('graph_path')
+        if graph_path is None:
+            graph_path = self._catalog['graph_path'] = self.execute('SHOW graph_path;').fetchone()[0]
+        return graph_path
 
     @graph_path.setter
-    def graph_path(self, graph_name): pass
+    def graph_path(self, graph_name):
+        self.execute('SET graph_path = {};'.format(graph_name))
+        self._catalog['graph_path'] = graph_name
+        if self._pool is not None:
+            # the SET may be committed or rolled back, so the pool does not
+            # know the graph_path of the connection anymore
+            self._pool._forget_graph_path(self.connection)
+
+    ############################################################################
+    # catalog cache ############################################################
+    ############################################################################
+
+    def invalidate_catalog(self):
+        '''
+        Drop all cached catalog metadata (labels, label ids, relids, label
+        inheritance, graph_path). It is reloaded on next access.
+
+        The cache is invalidated automatically by the DDL methods of the
+        Cursor (create_vlabel, drop_elabel, alter_vlabel(...)..., etc.) and
+        when nodes or edges are created with a label unknown to the cache.
+        DDL executed directly via Graph.execute requires a manual call.
+
+        Returns:
+
+            Graph
+        '''
+        graph_path = self._catalog.get('graph_path')
+        self._catalog = {}
+        if graph_path is not None:
+            self._catalog['graph_path'] = graph_path
+        return self
+
+    def _catalog_changed(self):
+        self.invalidate_catalog()
+
+    def _catalog_labels(self):
+        '''
+        (labid, relid, labname, labkind) of all labels of the graph, cached.
+        '''
+        labels = self._catalog.get('labels')
+        if labels is None:
+            self.execute(self._catalog_labels_query(self.graphid))
+            labels = self._catalog['labels'] = self.fetchall()
+        return labels
+
+    @classmethod
+    def _catalog_labels_query(cls, graphid):
+        return "SELECT labid, relid, labname, labkind FROM pg_catalog.ag_label WHERE graphid = {};"\
+               .format(graphid)
 
     @property
     def nv(self):
         return self.execute('MATCH (v) RETURN count(v);').fetchone()[0]
 
     def numv(self, label=None, prop={}, where=None):
+        '''
+        Number of vertices, optionally of a label and/or matching properties.
+        Without a (Cypher) where clause this runs as prepared statement:
+
+        SELECT count(*) FROM graph.label [WHERE properties @> $1];
+        '''
+        if where:
+            return self.execute(self._numv(label, prop, where)).fetchone()[0]
+        if label and not self._has_xlabel(label, 'v'):
+            return 0
+        query = 'SELECT count(*) FROM {}'.format(self._xlabel_table(label if label else 'ag_vertex'))
+        if prop:
+            query += ' WHERE properties @> $1'
+            return self.execute_prepared(query, (_properties_json(prop),), ('jsonb',)).fetchone()[0]
+        return self.execute_prepared(query).fetchone()[0]
+
+    @classmethod
+    def _numv(cls, label=None, prop={}, where=None):
         label = ':'+label if label else ''
+        prop = ' '+_cypher_literal(prop) if prop else ''
         where = ' WHERE '+where if where else ''
-        return self.execute('MATCH (v{} {}){} RETURN count(v);'.format(label, prop, where)).fetchone()[0]
+        return 'MATCH (v{}{}){} RETURN count(v);'.format(label, prop, where)
 
     def xlabels(self, x):
-        self.execute("SELECT labname FROM pg_catalog.ag_label WHERE graphid = {} AND labkind = '{}';"
-                     .format(self.graphid, x))
-        return [label[0] for label in self.fetchall()]
+        return [labname for _, _, labname, labkind in self._catalog_labels() if labkind == x]
+
+    def _has_xlabel(self, label, x):
+        '''
+        Whether the graph has the label of kind x. A label unknown to the
+        cache may have been created by raw queries or another session, so
+        the catalog is reloaded once before answering no.
+        '''
+        if label in self.xlabels(x):
+            return True
+        self.invalidate_catalog()
+        return label in self.xlabels(x)
 
     @property
     def vlabels(self):
@@ -85,23 +436,51 @@ class Graph(agenspy.cursor.Cursor):
     def elabels(self):
         return self.xlabels('e')
 
-    def create_nodes(self, n, labels=None, properties=None):
-        if labels:
-            labels = labels if isinstance(labels, list) else n*[labels]
-            assert n == len(labels), 'List of labels has to have n elemnts.'
-        if properties:
-            properties = properties if isinstance(properties, list) else n*[properties]
-            properties = [str(prob) for prob in properties]
+    def create_nodes(self, n, labels=None, properties=None, page_size=1000):
+        '''
+        Create n nodes in batches.
+
+        Args:
+
+            n (int): number of nodes to create
+            labels: list of n labels or a single label for all nodes
+            properties: list of n property dicts or a single dict for all nodes
+            page_size (int): maximum number of nodes sent per statement
+
+        Returns:
+
+            agenspy.types.VertexList: the created nodes in input order
+
+        ------------------------------------------------------------------------
+
+        Nodes are grouped by label and inserted into the label tables with
+        multi-row statements, one round trip per page_size nodes:
+
+        INSERT INTO graph.label (properties) VALUES (p1), ..., (pK) RETURNING id;
+        '''
+        if isinstance(labels, list):
+            assert n == len(labels), 'List of labels has to have n elements.'
+        else:
+            labels = n*[labels]
+        if isinstance(properties, list):
             assert n == len(properties), 'List of properties has to have n elements.'
-        if labels and properties:
-            argslist = [(label, prob) for label, prob in zip(labels, properties)]
-            psycopg2.extras.execute_batch('CREATE (:%s %s)', argslist)
-        elif not labels:
-            argslist = [(prob,) for prob in properties]
-            psycopg2.extras.execute_batch('CREATE (%s)', argslist)
-        elif not properties:
-            argslist = [(label,) for label in labels]
-            psycopg2.extras.execute_batch('CREATE (:%s)', argslist)
+        else:
+            properties = n*[{} if properties is None else properties]
+        nodes = agenspy.types.VertexList(n*[None])
+        for label, indices in _group_indices(labels).items():
+            table_label = label if label else 'ag_vertex'
+            self._ensure_xlabel(table_label, 'v')
+            argslist = [(_properties_json(properties[index]),) for index in indices]
+            ids = psycopg2.extras.execute_values(self,
+                                                 'INSERT INTO {} (properties) VALUES %s RETURNING id'
+                                                 .format(self._xlabel_table(table_label)),
+                                                 argslist,
+                                                 template='(%s::jsonb)',
+                                                 page_size=page_size,
+                                                 fetch=True)
+            for index, (ID,) in zip(indices, ids):
+                nodes[index] = agenspy.types.GraphVertex(ID, self, table_label, properties[index])
+        return nodes
 
     def create_node(self, label=None, properties={}, **kwargs):
         '''
@@ -119,19 +498,40 @@ class Graph(agenspy.cursor.Cursor):
 
         CREATE ([:label] [properties]);
 
-        Technically: CREATE (v[:label] [properties]) RETURN id(v);
+        Technically, as prepared statement with the properties as parameter:
+
+        INSERT INTO graph.label (properties) VALUES ($1) RETURNING id;
+
+        Inside a Graph.batch context the node is queued instead.
+        '''
+        if self._batch is not None:
+            return self._batch.create_node(label, properties, **kwargs)
+        properties = { **properties, **kwargs }
+        table_label = label if label else 'ag_vertex'
+        self._ensure_xlabel(table_label, 'v')
+        self.execute_prepared(self._insert_node_query(self._xlabel_table(table_label)),
+                              (_properties_json(properties),),
+                              ('jsonb',))
+        ID = self.fetchone()[0]
+        return agenspy.types.GraphVertex(ID, self, table_label, properties)
+
+    @classmethod
+    def _insert_node_query(cls, vertex_table):
+        return 'INSERT INTO {} (properties) VALUES ($1) RETURNING id;'.format(vertex_table)
+
+    @classmethod
+    def _create_node(cls, label=None, properties={}):
+        '''
+        CREATE (v[:label] [properties]) RETURN id(v);
         '''
         cmd = ['CREATE (v']
         if label:
             cmd.append(':'+label)
-        properties = { **properties, **kwargs }
         if properties:
-            cmd.append(str(properties))
+            cmd.append(_cypher_literal(properties))
         cmd.append(')')
         cmd.append('RETURN id(v);')
-        self.execute(' '.join(cmd))
-        ID = self.fetchone()[0]
-        return agenspy.GraphVertex(ID, self)
+        return ' '.join(cmd)
 
     def create_edge(self, source, relation=None, target=None, properties={}, **kwargs):
         '''
@@ -158,24 +558,188 @@ class Graph(agenspy.cursor.Cursor):
         AND   id(t) = CAST(tid as graphid)
         CREATE (s)-[e[:relation] [properties]]->(t)
         RETURN id(e);
+
+        Technically, as prepared statement with ids and properties as parameters:
+
+        INSERT INTO graph.relation (start, "end", properties)
+        SELECT $1, $2, $3
+        WHERE EXISTS (SELECT 1 FROM graph.ag_vertex WHERE id = $1)
+        AND   EXISTS (SELECT 1 FROM graph.ag_vertex WHERE id = $2)
+        RETURNING id;
+
+        Inside a Graph.batch context the edge is queued instead.
         '''
+        if self._batch is not None:
+            return self._batch.create_edge(source, relation, target, properties, **kwargs)
         if target is None:
             return self.create_self_loop(source, relation, properties, **kwargs)
         properties = { **properties, **kwargs }
+        table_label = relation if relation else 'ag_edge'
+        self._ensure_xlabel(table_label, 'e')
+        self.execute_prepared(self._insert_edge_query(self._xlabel_table(table_label),
+                                                      self._xlabel_table('ag_vertex')),
+                              (source.id, target.id, _properties_json(properties)),
+                              ('graphid', 'graphid', 'jsonb'))
+        row = self.fetchone()
+        if row is None:
+            raise ValueError('Source {} or target {} does not exist.'.format(source.id, target.id))
+        return agenspy.types.GraphEdge(row[0], self, source.id, target.id, table_label, properties)
+
+    @classmethod
+    def _insert_edge_query(cls, edge_table, vertex_table):
+        return ' '.join(['INSERT INTO {} (start, "end", properties)'.format(edge_table),
+                         'SELECT $1, $2, $3',
+                         'WHERE EXISTS (SELECT 1 FROM {} WHERE id = $1)'.format(vertex_table),
+                         'AND EXISTS (SELECT 1 FROM {} WHERE id = $2)'.format(vertex_table),
+                         'RETURNING id;'])
+
+    @classmethod
+    def _create_edge(cls, source, relation=None, target=None, properties={}):
+        '''
+        MATCH (s),(t)
+        WHERE id(s) = CAST(sid as graphid)
+        AND   id(t) = CAST(tid as graphid)
+        CREATE (s)-[e[:relation] [properties]]->(t)
+        RETURN id(e);
+        '''
+        if target is None:
+            return cls._create_self_loop(source, relation, properties)
         _relation = 'e'
         if relation:
             _relation += (':'+relation)
         if properties:
-            _relation += (' '+str(properties))
+            _relation += (' '+_cypher_literal(properties))
         cmd = ['MATCH (s),(t) WHERE']
         cmd.append('('+source._match('s'))
         cmd.append('AND')
         cmd.append(target._match('t')+')')
         cmd.append('CREATE (s)-['+_relation+']->(t)')
         cmd.append('RETURN id(e);')
-        self.execute(' '.join(cmd))
-        ID = self.fetchone()[0]
-        return agenspy.types.GraphEdge(ID, self, source.id, target.id)
+        return ' '.join(cmd)
+
+    def create_edges(self, pairs, label=None, properties=None, page_size=1000):
+        '''
+        Create edges in batches.
+
+        Args:
+
+            pairs: iterable of (source, target) or (source, target, properties)
+                   where source and target are agenspy.types.GraphVertex
+                   instances or graphids (e.g. rows of a NumPy array of
+                   graphid strings)
+            label: list of labels (one per pair) or a single label for all edges
+            properties: list of property dicts (one per pair) or a single dict
+                        for all edges, updated by the per pair properties
+            page_size (int): maximum number of edges sent per statement
+
+        Returns:
+
+            agenspy.types.EdgeList: the created edges in input order
+
+        ------------------------------------------------------------------------
+
+        Edges are grouped by label and inserted into the label tables with
+        multi-row statements, one round trip per page_size edges:
+
+        INSERT INTO graph.label (start, "end", properties)
+        VALUES (sid1, tid1, p1), ..., (sidK, tidK, pK) RETURNING id;
+        '''
+        pairs = [tuple(pair) for pair in pairs]
+        n = len(pairs)
+        labels = label if isinstance(label, list) else n*[label]
+        assert n == len(labels), 'List of labels has to have one element per pair.'
+        if isinstance(properties, list):
+            assert n == len(properties), 'List of properties has to have one element per pair.'
+        else:
+            properties = n*[{} if properties is None else properties]
+        sids = [_graphid_of(pair[0]) for pair in pairs]
+        tids = [_graphid_of(pair[1]) for pair in pairs]
+        properties = [{**properties[index], **pair[2]} if len(pair) > 2 else properties[index]
+                      for index, pair in enumerate(pairs)]
+        edges = agenspy.types.EdgeList(n*[None])
+        for label, indices in _group_indices(labels).items():
+            table_label = label if label else 'ag_edge'
+            self._ensure_xlabel(table_label, 'e')
+            argslist = [(sids[index], tids[index], _properties_json(properties[index]))
+                        for index in indices]
+            ids = psycopg2.extras.execute_values(self,
+                                                 'INSERT INTO {} (start, "end", properties) VALUES %s RETURNING id'
+                                                 .format(self._xlabel_table(table_label)),
+                                                 argslist,
+                                                 template='(%s::graphid, %s::graphid, %s::jsonb)',
+                                                 page_size=page_size,
+                                                 fetch=True)
+            for index, (ID,) in zip(indices, ids):
+                edges[index] = agenspy.types.GraphEdge(ID,
+                                                       self,
+                                                       sids[index],
+                                                       tids[index],
+                                                       table_label,
+                                                       properties[index])
+        return edges
+
+    def batch(self, size=1000, commit=True):
+        '''
+        Unit of work for writes: inside the context, create_node, create_edge
+        and create_self_loop (of the Graph or the returned GraphBatch) are
+        queued and created with multi-row statements whenever size creations
+        are queued and on exit:
+
+            > with graph.batch(size=5000) as batch:
+            >     for gene in genes:
+            >         v = graph.create_node('gene', symbol=gene)
+            >         graph.create_edge(v, 'in', pathway)
+
+        The returned vertices and edges are placeholders, their ids (and
+        the sid/tid of edges) are None until their batch is flushed. Nodes
+        are flushed before edges, so placeholders can be connected. Do not
+        hash placeholders (sets, dict keys) before they are flushed.
+        Unlike Graph.create_edge, batched edges do not check that their
+        endpoints exist.
+
+        Args:
+
+            size (int): number of queued creations triggering a flush
+            commit (bool): commit after every flush
+
+        Returns:
+
+            GraphBatch
+        '''
+        return GraphBatch(self, size, commit)
+
+    def bulk_load_mode(self,
+                       vlabels=(),
+                       elabels=(),
+                       strategy='drop',
+                       unlogged=False,
+                       concurrently=False,
+                       workers=1,
+                       system_indexes=False):
+        '''
+        Defer index and constraint maintenance of labels during a bulk load:
+
+            > with graph.bulk_load_mode(vlabels=['gene'], unlogged=True, workers=4):
+            >     graph.create_from_igraph(G, node_label='gene', bulk=True)
+
+        On entry the property indexes and constraints of the labels are
+        recorded and dropped (or disabled), on exit the load is committed
+        (rolled back on error) and they are rebuilt. See
+        agenspy.bulk.BulkLoadMode for the arguments.
+
+        Returns:
+
+            agenspy.bulk.BulkLoadMode
+        '''
+        self._check_workers(workers)
+        return agenspy.bulk.BulkLoadMode(self,
+                                         vlabels,
+                                         elabels,
+                                         strategy,
+                                         unlogged,
+                                         concurrently,
+                                         workers,
+                                         system_indexes)
 
     def create_self_loop(self, node, relation=None, properties={}, **kwargs):
         '''
@@ -200,34 +764,126 @@ class Graph(agenspy.cursor.Cursor):
         CREATE (v)-[e[:relation] [properties]]->(v)
         RETURN id(e);
         '''
-        properties = { **properties, **kwargs }
+        return self.create_edge(node, relation, node, properties, **kwargs)
+
+    @classmethod
+    def _create_self_loop(cls, node, relation=None, properties={}):
+        '''
+        MATCH (v)
+        WHERE id(v) = CAST(vid as graphid)
+        CREATE (v)-[e[:relation] [properties]]->(v)
+        RETURN id(e);
+        '''
         _relation = 'e'
         if relation:
             _relation += (':'+relation)
         if properties:
-            _relation += (' '+str(properties))
+            _relation += (' '+_cypher_literal(properties))
         cmd = ['MATCH (v) WHERE']
         cmd.append(node._match('v'))
         cmd.append('CREATE (v)-['+_relation+']->(v)')
         cmd.append('RETURN id(e);')
-        ID = self.execute(' '.join(cmd)).fetchone()[0]
-        return agenspy.types.GraphEdge(ID, self, node.id, node.id)
+        return ' '.join(cmd)
 
     def match_nodes(self, labels, properties):
         pass
 
-    def induced_subgraph(self, entities):
+    def induced_subgraph(self, entities, chunk_size=10000):
+        '''
+        Node- or edge-induced subgraph, depending on whether entities are
+        vertices or edges (GraphVertex/GraphEdge instances or graphids,
+        told apart by their label ids).
+
+        Returns:
+
+            Subgraph
+        '''
         entities = list(entities)
-        if isinstance(entities[0], Node):
-            return self.node_induced_subgraph(entities)
-        else:
-            return self.edge_induced_subgraph(entities)
+        if not entities:
+            return Subgraph([], [], normalized=True)
+        first = entities[0]
+        if isinstance(first, agenspy.types.GraphEdge):
+            return self.edge_induced_subgraph(entities, chunk_size)
+        if not isinstance(first, agenspy.types.GraphVertex):
+            labkinds = {labid: labkind for labid, _, _, labkind in self._catalog_labels()}
+            if labkinds.get(_graphid_of(first).oid) == 'e':
+                return self.edge_induced_subgraph(entities, chunk_size)
+        return self.node_induced_subgraph(entities, chunk_size)
+
+    def edge_induced_subgraph(self, edges, chunk_size=10000):
+        '''
+        The given edges and their endpoints, fetched in two set-based
+        queries (per chunk_size ids):
 
-    def edge_induced_subgraph(self, edges):
-        pass
+        SELECT id, start, "end", properties FROM graph.ag_edge WHERE id = ANY($1);
 
-    def node_induced_subgraph(self, nodes):
-        pass
+        SELECT v.id, l.labname, v.properties FROM graph.ag_vertex AS v ...
+        WHERE v.id = ANY($1);
+
+        Args:
+
+            edges: GraphEdge instances or graphids
+            chunk_size (int): maximum number of ids per query
+
+        Returns:
+
+            Subgraph
+        '''
+        ids = list({_graphid_of(edge): None for edge in edges})
+        query = self._edges_by_id_query(self._xlabel_table('ag_edge'))
+        rows = []
+        for offset in range(0, len(ids), chunk_size):
+            self.execute_prepared(query, (ids[offset:offset+chunk_size],), ('graphid[]',))
+            rows.extend(self.fetchall())
+        edges = [agenspy.types.GraphEdge(ID, self, sid, tid, properties=properties)
+                 for ID, sid, tid, properties in rows]
+        node_ids = { edge.sid for edge in edges } | { edge.tid for edge in edges }
+        nodes = self._match_vertices(node_ids, chunk_size)
+        return Subgraph(nodes, edges, normalized=True)
+
+    @classmethod
+    def _edges_by_id_query(cls, edge_table):
+        return 'SELECT edges.id, edges.start, edges."end", edges.properties '+\
+               'FROM {} AS edges WHERE edges.id = ANY($1);'.format(edge_table)
+
+    def node_induced_subgraph(self, nodes, chunk_size=10000):
+        '''
+        The given vertices and all edges among them, fetched in two
+        set-based queries (per chunk_size ids):
+
+        SELECT v.id, l.labname, v.properties FROM graph.ag_vertex AS v ...
+        WHERE v.id = ANY($1);
+
+        SELECT id, start, "end", properties FROM graph.ag_edge
+        WHERE start = ANY($1);
+
+        Edges whose end is not among the vertices are dropped on the client,
+        so every id is sent to the server only once per query.
+
+        Args:
+
+            nodes: GraphVertex instances or graphids
+            chunk_size (int): maximum number of ids per query
+
+        Returns:
+
+            Subgraph
+        '''
+        ids = list({_graphid_of(node): None for node in nodes})
+        vertices = self._match_vertices(ids, chunk_size)
+        members = set(ids)
+        query = self._out_edges_query(self._xlabel_table('ag_edge'))
+        edges = []
+        for offset in range(0, len(ids), chunk_size):
+            self.execute_prepared(query, (ids[offset:offset+chunk_size],), ('graphid[]',))
+            edges.extend(agenspy.types.GraphEdge(ID, self, sid, tid, properties=properties)
+                         for ID, sid, tid, properties in self.fetchall() if tid in members)
+        return Subgraph(vertices, edges, normalized=True)
+
+    @classmethod
+    def _out_edges_query(cls, edge_table):
+        return 'SELECT edges.id, edges.start, edges."end", edges.properties '+\
+               'FROM {} AS edges WHERE edges.start = ANY($1);'.format(edge_table)
 
     def subgraph_query(self, query):
         self.execute(query)
@@ -236,6 +892,28 @@ class Graph(agenspy.cursor.Cursor):
         edges = list({entity for t in tuples for entity in t if isinstance(entity, agenspy.GraphEdge)})
         return Subgraph(nodes, edges)
 
+    def iter_subgraph_query(self, query, chunk_size=10000):
+        '''
+        Streaming variant of Graph.subgraph_query.
+
+        The query is run on a named (server-side) cursor and the vertices
+        and edges of every chunk_size result rows are yielded as a Subgraph,
+        so memory is bounded by the chunk size rather than the result size.
+
+        Args:
+
+            query (str): Cypher or SQL query returning vertices and/or edges
+            chunk_size (int): number of rows per yielded Subgraph
+
+        Yields:
+
+            Subgraph: vertices and edges of the next chunk_size rows
+        '''
+        for tuples in self._iter_server_side(query, chunk_size):
+            nodes = list({entity for t in tuples for entity in t if isinstance(entity, agenspy.GraphVertex)})
+            edges = list({entity for t in tuples for entity in t if isinstance(entity, agenspy.GraphEdge)})
+            yield Subgraph(nodes, edges)
+
     def subgraph(self,
                  source_label=None,
                  source_property_filter=None,
@@ -247,22 +925,111 @@ class Graph(agenspy.cursor.Cursor):
                  target_property_filter=None,
                  target_properties=None,
                  where_clause=None,
-                 conjunctive=True):
+                 conjunctive=True,
+                 chunk_size=10000,
+                 columnar=False):
         '''
         MATCH (s[:sl] [sp])->[e[:el] [ep]]->(t[:tl] [tp])
         WHERE where_clause(s,e,t)
         RETURN id(e), id(s), id(t), p1(e), ..., pM(e);
 
-        MATCH (v)
-        WHERE id(v) in ( CAST(vid1 as graphid), ..., CAST(vidN as graphid) )
-        RETURN id(v), p1(v), ..., pN(v);
+        SELECT id, label, properties FROM graph.ag_vertex
+        WHERE id = ANY(ARRAY[vid1, ..., vidK]::graphid[]);
+
+        The endpoints are fetched in chunks of chunk_size ids.
+        If columnar is True, a ColumnarSubgraph is returned.
         '''
+        self.execute(self._subgraph_query(source_label,
+                                          source_property_filter,
+                                          edge_label,
+                                          edge_property_filter,
+                                          edge_property_proj,
+                                          target_label,
+                                          target_property_filter,
+                                          where_clause,
+                                          conjunctive))
+        if columnar:
+            edge_rows = self.fetchall()
+            node_ids = { edge[1] for edge in edge_rows } | { edge[2] for edge in edge_rows }
+            return ColumnarSubgraph._from_rows(self,
+                                               edge_rows,
+                                               self._match_vertex_rows(node_ids, chunk_size))
+        edges = self._edges_from_rows(self.fetchall())
+        node_ids = { edge.sid for edge in edges } | { edge.tid for edge in edges }
+        nodes = self._match_vertices(node_ids, chunk_size)
+        return Subgraph(nodes, edges, normalized=True)
+
+    def iter_subgraph(self,
+                      source_label=None,
+                      source_property_filter=None,
+                      source_property_proj=None,
+                      edge_label=None,
+                      edge_property_filter=None,
+                      edge_property_proj=None,
+                      target_label=None,
+                      target_property_filter=None,
+                      target_properties=None,
+                      where_clause=None,
+                      conjunctive=True,
+                      chunk_size=10000,
+                      unique_nodes=False):
+        '''
+        Streaming variant of Graph.subgraph.
+
+        The edge query is run on a named (server-side) cursor fetching
+        chunk_size rows per round trip. For every chunk the endpoints are
+        fetched and a normalized Subgraph is yielded, so memory is bounded
+        by the chunk size rather than the result size.
+
+        Args:
+
+            source_label, ..., conjunctive: see Graph.subgraph
+            chunk_size (int): number of edges per yielded Subgraph
+            unique_nodes (bool): if True, every vertex is yielded only with
+                                 the first chunk it appears in. This keeps
+                                 the set of seen vertex ids in memory.
+                                 Default: False
+
+        Yields:
+
+            Subgraph: the next chunk_size edges and their endpoints
+        '''
+        query = self._subgraph_query(source_label,
+                                     source_property_filter,
+                                     edge_label,
+                                     edge_property_filter,
+                                     edge_property_proj,
+                                     target_label,
+                                     target_property_filter,
+                                     where_clause,
+                                     conjunctive)
+        seen = set()
+        for rows in self._iter_server_side(query, chunk_size):
+            edges = self._edges_from_rows(rows)
+            node_ids = { edge.sid for edge in edges } | { edge.tid for edge in edges }
+            if unique_nodes:
+                node_ids -= seen
+                seen |= node_ids
+            nodes = self._match_vertices(node_ids, chunk_size)
+            yield Subgraph(nodes, edges, normalized=not unique_nodes)
+
+    @classmethod
+    def _subgraph_query(cls,
+                        source_label=None,
+                        source_property_filter=None,
+                        edge_label=None,
+                        edge_property_filter=None,
+                        edge_property_proj=None,
+                        target_label=None,
+                        target_property_filter=None,
+                        where_clause=None,
+                        conjunctive=True):
 
         def add_label_and_property_filter(cmd, label, property_filter):
             if label:
                 cmd.append(':'+str(label))
             if property_filter:
-                cmd.append(str(property_filter))
+                cmd.append(_cypher_literal(property_filter))
 
         cmd = ['MATCH (s']
         add_label_and_property_filter(cmd, source_label, source_property_filter)
@@ -274,9 +1041,9 @@ class Graph(agenspy.cursor.Cursor):
         if where_clause:
             cmd.append('WHERE')
             if conjunctive:
-                cmd.append(self._parse_conjnmf(where_clause))
+                cmd.append(cls._parse_conjnmf(where_clause))
             else:
-                cmd.append(self._parse_disjnmf(where_clause))
+                cmd.append(cls._parse_disjnmf(where_clause))
         cmd.append('RETURN')
         ret = ['id(e)', 'id(s)', 'id(t)', 'type(e)']
         if edge_property_proj is None:
@@ -287,30 +1054,445 @@ class Graph(agenspy.cursor.Cursor):
             ret.append('properties(e)')
         cmd.append(', '.join(ret))
         cmd[-1] += ';'
-        self.execute(' '.join(cmd))
-        edges = [agenspy.types.GraphEdge(ID=edge[0],
-                           graph=self,
-                           sid=edge[1],
-                           tid=edge[2],
-                           label=edge[3],
-                           properties=edge[4])
-                 for edge in self.fetchall()]
-        node_ids = { edge.sid for edge in edges } | { edge.tid for edge in edges }
-        cmd = ['MATCH (v) WHERE ']
-        cmd.append(' OR '.join(["id(v) = (SELECT CAST('{}' AS graphid))".format(ID) for ID in node_ids]))
-        cmd.append(' RETURN')
-        cmd.append(', '.join(['id(v)', 'label(v)', 'properties(v)']))
-        cmd[-1] += ';'
-        self.execute(' '.join(cmd))
-        nodes = [agenspy.types.GraphVertex(ID=node[0],
-                                           graph=self,
-                                           label=node[1],
-                                           properties=node[2])
-                 for node in self.fetchall()]
+        return ' '.join(cmd)
+
+    def _edges_from_rows(self, rows):
+        '''
+        (id(e), id(s), id(t), type(e), properties(e)) rows --> GraphEdges
+        '''
+        return [agenspy.types.GraphEdge(ID=edge[0],
+                                        graph=self,
+                                        sid=edge[1],
+                                        tid=edge[2],
+                                        label=edge[3],
+                                        properties=edge[4])
+                for edge in rows]
+
+    def _iter_server_side(self, query, chunk_size, args=None):
+        '''
+        Run query (with args) on a named cursor of the connection and yield
+        its result in lists of at most chunk_size rows. The query is wrapped
+        into SELECT * FROM (query) such that Cypher queries can be declared
+        as cursors as well. Needs to run inside a transaction.
+        '''
+        query = 'SELECT * FROM ({}) AS rows'.format(query.strip().rstrip(';'))
+        cursor = _ServerCursor(self.connection, 'agenspy_{}'.format(next(_server_cursor_ids)), self)
+        cursor.itersize = chunk_size
+        try:
+            started = time.time()
+            cursor.execute(query, args)
+            self._log_query(query, started, cursor)
+            if self.verbose:
+                print(query)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            cursor.close()
+
+    def _match_vertices(self, ids, chunk_size=10000):
+        '''
+        Fetch vertices by id with one set-based lookup per chunk_size ids:
+
+        SELECT v.id, l.labname, v.properties
+        FROM graph.ag_vertex AS v
+        INNER JOIN pg_catalog.ag_label AS l ON l.relid = v.tableoid
+        WHERE v.id = ANY(ARRAY[vid1, ..., vidK]::graphid[]);
+        '''
+        return [agenspy.types.GraphVertex(ID=node[0],
+                                          graph=self,
+                                          label=node[1],
+                                          properties=node[2])
+                for node in self._match_vertex_rows(ids, chunk_size)]
+
+    @classmethod
+    def _match_vertices_query(cls, vertex_table, prepared=False):
+        return 'SELECT vertices.id, labels.labname, vertices.properties '+\
+               'FROM {} AS vertices '.format(vertex_table)+\
+               'INNER JOIN pg_catalog.ag_label AS labels ON labels.relid = vertices.tableoid '+\
+               'WHERE vertices.id = ANY({});'.format('$1' if prepared else '%s::graphid[]')
+
+    def _match_vertex_rows(self, ids, chunk_size=10000):
+        '''
+        Like Graph._match_vertices, but yielding (id, label, properties) rows.
+        '''
+        ids = list(ids)
+        query = self._match_vertices_query(self._xlabel_table('ag_vertex'), prepared=True)
+        for offset in range(0, len(ids), chunk_size):
+            self.execute_prepared(query, (ids[offset:offset+chunk_size],), ('graphid[]',))
+            yield from self.fetchall()
+
+    def fetch_properties(self, entities, keys=None, chunk_size=10000):
+        '''
+        Load properties of many vertices and/or edges with one query per
+        chunk_size entities and store them in the entities' caches.
+
+        Args:
+
+            entities: iterable of agenspy.types.GraphVertex/GraphEdge
+            keys (list): property keys to load, all properties if None
+            chunk_size (int): maximum number of ids per query
+
+        Returns:
+
+            Graph
+
+        ------------------------------------------------------------------------
+
+        SELECT id, properties FROM graph.ag_vertex WHERE id = ANY(ids);
+
+        or for given keys only:
+
+        SELECT id, (SELECT jsonb_object_agg(key, value)
+                    FROM jsonb_each(properties) WHERE key = ANY(keys))
+        FROM graph.ag_vertex WHERE id = ANY(ids);
+
+        (and the same on graph.ag_edge for edges)
+        '''
+        if keys is not None:
+            keys = list(keys)
+        vertices = collections.defaultdict(list)
+        edges = collections.defaultdict(list)
+        for entity in entities:
+            if isinstance(entity, agenspy.types.GraphEdge):
+                edges[entity.id].append(entity)
+            else:
+                vertices[entity.id].append(entity)
+        for table, id2entities in (('ag_vertex', vertices), ('ag_edge', edges)):
+            query = self._fetch_properties_query(self._xlabel_table(table), keys, prepared=True)
+            ids = list(id2entities)
+            for offset in range(0, len(ids), chunk_size):
+                chunk = ids[offset:offset+chunk_size]
+                if keys is None:
+                    self.execute_prepared(query, (chunk,), ('graphid[]',))
+                else:
+                    self.execute_prepared(query, (keys, chunk), ('text[]', 'graphid[]'))
+                for ID, properties in self.fetchall():
+                    for entity in id2entities[ID]:
+                        entity._cache_properties({} if properties is None else properties, keys)
+        return self
+
+    @classmethod
+    def _fetch_properties_query(cls, table, keys=None, prepared=False):
+        if keys is None:
+            projection = 'entities.properties'
+            ids = '$1' if prepared else '%s::graphid[]'
+        else:
+            projection = '(SELECT jsonb_object_agg(p.key, p.value) '+\
+                         'FROM jsonb_each(entities.properties) AS p WHERE p.key = ANY({}))'\
+                         .format('$1' if prepared else '%s')
+            ids = '$2' if prepared else '%s::graphid[]'
+        return 'SELECT entities.id, {} FROM {} AS entities WHERE entities.id = ANY({});'\
+               .format(projection, table, ids)
+
+    ############################################################################
+    # neighborhoods ############################################################
+    ############################################################################
+
+    def _xlabel_descendants(self, labels, x):
+        '''
+        The given labels and all labels inheriting from them (transitively).
+        '''
+        children = collections.defaultdict(list)
+        for parent, child in self._get_xlabel_inheritance(x):
+            children[parent].append(child)
+        descendants = set()
+        stack = [labels] if isinstance(labels, str) else list(labels)
+        while stack:
+            label = stack.pop()
+            if label not in descendants:
+                descendants.add(label)
+                stack.extend(children[label])
+        return descendants
+
+    def _xlabel_relids(self, labels, x):
+        descendants = self._xlabel_descendants(labels, x)
+        return [relid for _, relid, labname, labkind in self._catalog_labels()
+                if labkind == x and labname in descendants]
+
+    def _xlabel_labids(self, labels, x):
+        descendants = self._xlabel_descendants(labels, x)
+        return {labid for labid, _, labname, labkind in self._catalog_labels()
+                if labkind == x and labname in descendants}
+
+    def _expand(self, ids, incoming=True, outgoing=True, edge_relids=None, properties=False, chunk_size=10000):
+        '''
+        One hop of a level-synchronous traversal: the edges incident to the
+        whole frontier ids, one (prepared) query per chunk_size ids.
+
+        Yields:
+
+            (id, start, end[, properties]) rows
+        '''
+        if edge_relids is not None and not edge_relids:
+            return
+        query = self._expand_query(self._xlabel_table('ag_edge'),
+                                   incoming,
+                                   outgoing,
+                                   edge_relids is not None,
+                                   properties)
+        for offset in range(0, len(ids), chunk_size):
+            chunk = ids[offset:offset+chunk_size]
+            if edge_relids is None:
+                self.execute_prepared(query, (chunk,), ('graphid[]',))
+            else:
+                self.execute_prepared(query, (chunk, edge_relids), ('graphid[]', 'oid[]'))
+            yield from self.fetchall()
+
+    @classmethod
+    def _expand_query(cls, edge_table, incoming=True, outgoing=True, label_filter=False, properties=False):
+        '''
+        SELECT edges.id, edges.start, edges."end" [, edges.properties]
+        FROM graph.ag_edge AS edges
+        WHERE (edges.start = ANY($1) OR edges."end" = ANY($1))
+        [AND edges.tableoid = ANY($2)];
+        '''
+        assert incoming or outgoing, 'At least one of incoming and outgoing has to be True.'
+        columns = 'edges.id, edges.start, edges."end"'
+        if properties:
+            columns += ', edges.properties'
+        if incoming and outgoing:
+            condition = '(edges.start = ANY($1) OR edges."end" = ANY($1))'
+        elif outgoing:
+            condition = 'edges.start = ANY($1)'
+        else:
+            condition = 'edges."end" = ANY($1)'
+        if label_filter:
+            condition += ' AND edges.tableoid = ANY($2)'
+        return 'SELECT {} FROM {} AS edges WHERE {};'.format(columns, edge_table, condition)
+
+    def _traverse(self,
+                  seeds,
+                  depth=1,
+                  incoming=True,
+                  outgoing=True,
+                  edge_labels=None,
+                  vertex_labels=None,
+                  max_nodes=None,
+                  edges=False,
+                  edge_properties=False,
+                  induced=False,
+                  membership=False,
+                  chunk_size=10000):
+        '''
+        Level-synchronous breadth-first traversal from seeds: every hop
+        expands the whole frontier with one query (per chunk_size vertices),
+        visited vertices are not expanded again.
+
+        Args:
+
+            seeds: iterable of GraphVertex instances or graphids
+            depth (int): number of hops
+            incoming (bool): follow edges against their direction
+            outgoing (bool): follow edges in their direction
+            edge_labels: edge label or list of edge labels to follow
+                         (including inheriting labels), all if None
+            vertex_labels: vertex label or list of vertex labels to visit
+                           (including inheriting labels), all if None.
+                           The seeds are always visited.
+            max_nodes (int): raise a ValueError if more vertices are visited
+            edges (bool): collect the edges between visited vertices
+                          traversed on the way
+            edge_properties (bool): fetch the properties of these edges
+            induced (bool): expand the last frontier once more to collect
+                            the edges among the vertices of the last hop
+                            as well (all edges between visited vertices)
+            membership (bool): track which seeds reach which vertices
+
+        Returns:
+
+            (dict, dict, dict): graphid --> hop distance (from the closest
+                                seed) of the visited vertices,
+                                graphid --> (id, start, end[, properties])
+                                row of the collected edges,
+                                graphid --> int whose bit i is set if seed i
+                                reaches the vertex (if membership)
+        '''
+        edge_relids = None if edge_labels is None else self._xlabel_relids(edge_labels, 'e')
+        labids = None if vertex_labels is None else self._xlabel_labids(vertex_labels, 'v')
+        # every vertex carries a bit mask of the seeds reaching it; a vertex
+        # is expanded again (with the new bits only) if its mask grows
+        distances = collections.OrderedDict()
+        masks = {}
+        for index, seed in enumerate(seeds):
+            ID = _graphid_of(seed)
+            distances.setdefault(ID, 0)
+            masks[ID] = masks.get(ID, 0) | (1 << index if membership else 1)
+        collected = collections.OrderedDict()
+        deltas = dict(masks)
+        for hop in range(1, depth+2 if induced else depth+1):
+            if not deltas:
+                break
+            closing = hop > depth
+            next_deltas = {}
+            for row in self._expand(list(deltas), incoming, outgoing, edge_relids, edge_properties, chunk_size):
+                start, end = row[1], row[2]
+                steps = []
+                if outgoing and start in deltas:
+                    steps.append((start, end))
+                if incoming and end in deltas:
+                    steps.append((end, start))
+                for source, neighbor in steps:
+                    mask = masks.get(neighbor)
+                    if mask is None:
+                        if closing or (labids is not None and neighbor.oid not in labids):
+                            continue
+                        distances[neighbor] = hop
+                        mask = 0
+                    if edges:
+                        collected[row[0]] = row
+                    if closing:
+                        continue
+                    new = deltas[source] & ~mask
+                    if new:
+                        masks[neighbor] = mask | new
+                        next_deltas[neighbor] = next_deltas.get(neighbor, 0) | new
+                if max_nodes is not None and len(distances) > max_nodes:
+                    raise ValueError('Traversal exceeds max_nodes={} vertices.'.format(max_nodes))
+            deltas = next_deltas
+        return distances, collected, masks
+
+    def neighborhoods(self,
+                      seeds,
+                      depth=1,
+                      incoming=True,
+                      outgoing=True,
+                      edge_labels=None,
+                      vertex_labels=None,
+                      max_nodes=None,
+                      seed_label=None,
+                      seed_key=None,
+                      return_subgraph=False,
+                      induced=True,
+                      chunk_size=10000):
+        '''
+        Expand the depth-hop neighborhoods of many seed vertices at once:
+        one traversal (one query per hop and chunk_size frontier vertices)
+        for all seeds, tracking which seeds reach which vertices.
+
+            > hoods = graph.neighborhoods(['TP53', 'MDM2'], depth=3,
+            >                             seed_label='gene', seed_key='symbol')
+            > hoods.ids('TP53')
+
+        Args:
+
+            seeds: GraphVertex instances or graphids, or property values
+                   if seed_key is given
+            depth (int): number of hops
+            incoming (bool): follow incoming edges
+            outgoing (bool): follow outgoing edges
+            edge_labels: edge label(s) to follow, all if None
+            vertex_labels: vertex label(s) to visit, all if None
+            max_nodes (int): raise a ValueError if the union of the
+                             neighborhoods exceeds max_nodes vertices
+            seed_label (str): label of the seed vertices if seed_key is given
+            seed_key (str): seeds are the values of this property, resolved
+                            with one query (compared as JSON values). Values without vertex have empty
+                            neighborhoods, values of several vertices
+                            (within seed_label) expand from all of them.
+            return_subgraph (bool): also fetch the union of the
+                                    neighborhoods as Subgraph
+            induced (bool): see GraphVertex.neighborhood_graph
+
+        Returns:
+
+            Neighborhoods
+        '''
+        seeds = list(seeds)
+        if seed_key is not None:
+            keys = seeds
+            seed_ids = self._match_property_values(seed_label, seed_key, seeds, chunk_size)
+        else:
+            keys = [_graphid_of(seed) for seed in seeds]
+            seed_ids = [[ID] for ID in keys]
+        # one traversal seed per vertex, the bits of its seeds are merged below
+        vertex_seeds = list({ID: None for ids in seed_ids for ID in ids})
+        distances, edges, masks = self._traverse(vertex_seeds,
+                                                 depth,
+                                                 incoming,
+                                                 outgoing,
+                                                 edge_labels,
+                                                 vertex_labels,
+                                                 max_nodes,
+                                                 edges=return_subgraph,
+                                                 edge_properties=return_subgraph,
+                                                 induced=induced and return_subgraph,
+                                                 membership=True,
+                                                 chunk_size=chunk_size)
+        vertex_bit = {ID: index for index, ID in enumerate(vertex_seeds)}
+        subgraph = self._traversal_subgraph(distances, edges, chunk_size) if return_subgraph else None
+        return Neighborhoods(keys,
+                             [[vertex_bit[ID] for ID in ids] for ids in seed_ids],
+                             distances,
+                             masks,
+                             subgraph)
+
+    def _match_property_values(self, label, key, values, chunk_size=10000):
+        '''
+        values --> list of the graphids of the vertices (of label) whose
+        property key equals each value. Values are compared as JSON, so
+        True matches true rather than 'True':
+
+        SELECT seeds.n, vertices.id FROM graph.label AS vertices
+        JOIN unnest($2::jsonb[]) WITH ORDINALITY AS seeds(value, n)
+        ON vertices.properties->$1 = seeds.value;
+        '''
+        ids = [[] for _ in values]
+        if label and not self._has_xlabel(label, 'v'):
+            return ids
+        query = self._match_property_values_query(self._xlabel_table(label if label else 'ag_vertex'))
+        encoded = [json.dumps(value, default=_json_default) for value in values]
+        for offset in range(0, len(encoded), chunk_size):
+            self.execute_prepared(query, (key, encoded[offset:offset+chunk_size]), ('text', 'jsonb[]'))
+            for n, ID in self.fetchall():
+                ids[offset+n-1].append(ID)
+        return ids
+
+    @classmethod
+    def _match_property_values_query(cls, vertex_table):
+        return 'SELECT seeds.n, vertices.id FROM {} AS vertices '.format(vertex_table)+\
+               'JOIN unnest($2) WITH ORDINALITY AS seeds(value, n) '+\
+               'ON vertices.properties->$1 = seeds.value;'
+
+    def _traversal_subgraph(self, distances, edges, chunk_size=10000):
+        '''
+        Subgraph of the vertices and (id, start, end, properties) edge rows
+        of a traversal, see Graph._traverse.
+        '''
+        nodes = self._match_vertices(distances, chunk_size)
+        edges = [agenspy.types.GraphEdge(row[0], self, row[1], row[2], properties=row[3])
+                 for row in edges.values()]
         return Subgraph(nodes, edges, normalized=True)
 
-    def to_networkx(self, match=None, where=None):
-        pass
+    def to_networkx(self,
+                    source_label=None,
+                    source_property_filter=None,
+                    source_properties=None,
+                    edge_label=None,
+                    edge_property_filter=None,
+                    edge_properties=None,
+                    target_label=None,
+                    target_property_filter=None,
+                    target_properties=None,
+                    where_clause=None,
+                    conjunctive=True,
+                    **kwargs):
+        '''
+        See Graph.subgraph and Subgraph.to_networkx.
+        '''
+        return self.subgraph(source_label,
+                             source_property_filter,
+                             source_properties,
+                             edge_label,
+                             edge_property_filter,
+                             edge_properties,
+                             target_label,
+                             target_property_filter,
+                             target_properties,
+                             where_clause,
+                             conjunctive).to_networkx(**kwargs)
 
     def create_from_networkx(self, G):
       # --------------------- #
@@ -354,14 +1536,45 @@ class Graph(agenspy.cursor.Cursor):
                            return_subgraph=True,
                            strip_attrs=False,
                            strip_tokens={' ', '/', '-'},
-                           copy_graph=False):
+                           copy_graph=False,
+                           bulk=False,
+                           workers=1,
+                           partition_size=100000,
+                           progress=None):
         '''
+        Args:
 
+            G (igraph.Graph): graph to import
+            node_label_attr (str): vertex attribute holding the node labels
+            node_label (str): label for all nodes if node_label_attr is None
+            unique_node_attr (str): currently unused
+            edge_label_attr (str): edge attribute holding the edge labels
+            edge_label (str): label for all edges if edge_label_attr is None
+            return_subgraph (bool): return the created entities as Subgraph
+            strip_attrs (bool): replace strip_tokens in attribute names and
+                                string values by '_'
+            strip_tokens (set): tokens to be replaced if strip_attrs is True
+            copy_graph (bool): work on a copy of G (relevant if strip_attrs)
+            bulk (bool): if True, stream nodes and edges into the label tables
+                         via COPY instead of issuing one CREATE per entity.
+                         The resulting throughput is available as
+                         Graph.bulk_load_report afterwards. Default: False
+            workers (int): number of connections loading concurrently, see
+                           agenspy.parallel. Nodes are partitioned by label
+                           (and into chunks of partition_size) and loaded in
+                           parallel, then the edges. Every partition is
+                           committed on its own, so a failed import leaves
+                           the partitions loaded so far. workers > 1 implies
+                           bulk and needs a Graph from a GraphPool or with
+                           connection parameters (not connection=...).
+                           Default: 1
+            partition_size (int): maximum number of rows per partition
+            progress: function called with an agenspy.parallel.ImportProgress
+                      after every loaded partition (bulk only)
         '''
       # ------------------- #
         import igraph as ig
       # ------------------- #
-        # TODO BATCH THIS SOMEHOW
 
         def strip_igraph_attributes(entities, tokens):
             regex = '|'.join(['('+token+')' for token in tokens])
@@ -377,6 +1590,17 @@ class Graph(agenspy.cursor.Cursor):
         if strip_attrs:
             strip_igraph_attributes(G.vs, strip_tokens)
             strip_igraph_attributes(G.es, strip_tokens)
+        if bulk or workers > 1:
+            self._check_workers(workers)
+            node_labels = G.vs[node_label_attr] if node_label_attr else G.vcount()*[node_label]
+            edge_labels = G.es[edge_label_attr] if edge_label_attr else G.ecount()*[edge_label]
+            return self._bulk_create_from_igraph(G,
+                                                 node_labels,
+                                                 edge_labels,
+                                                 return_subgraph,
+                                                 workers,
+                                                 partition_size,
+                                                 progress)
         # nodes
         if node_label_attr:
             nodes = [self.create_node(v[node_label_attr],
@@ -403,14 +1627,184 @@ class Graph(agenspy.cursor.Cursor):
         if return_subgraph:
             return Subgraph(nodes, edges, normalized=True)
 
+    def _bulk_create_from_igraph(self,
+                                 G,
+                                 node_labels,
+                                 edge_labels,
+                                 return_subgraph,
+                                 workers=1,
+                                 partition_size=100000,
+                                 progress=None):
+        '''
+        COPY based implementation of Graph.create_from_igraph.
+
+        Node ids are reserved from the label sequences upfront, so the
+        igraph index --> graphid map is known before any row is sent and
+        edges can be streamed right after the nodes.
+        '''
+        start = time.time()
+        node_attrs = G.vs.attribute_names()
+        node_properties = list(zip(*[G.vs[attr] for attr in node_attrs])) if node_attrs else G.vcount()*[()]
+        edge_attrs = G.es.attribute_names()
+        edge_properties = list(zip(*[G.es[attr] for attr in edge_attrs])) if edge_attrs else G.ecount()*[()]
+        # nodes
+        node_ids = G.vcount()*[None]
+        node_partitions = []
+        for label, indices in _group_indices(node_labels).items():
+            label = label if label else 'ag_vertex'
+            ids = self._reserve_xlabel_ids(label, 'v', len(indices))
+            for index, ID in zip(indices, ids):
+                node_ids[index] = ID
+            query = self._copy_query(label, ('id', 'properties'))
+            for offset in range(0, len(indices), partition_size):
+                chunk = indices[offset:offset+partition_size]
+                rows = _node_copy_rows(ids[offset:offset+partition_size], chunk, node_attrs, node_properties)
+                node_partitions.append(agenspy.parallel.CopyPartition('v', query, rows, len(chunk)))
+        # edges
+        edge_list = G.get_edgelist()
+        edge_ids = G.ecount()*[None]
+        edge_partitions = []
+        for label, indices in _group_indices(edge_labels).items():
+            label = label if label else 'ag_edge'
+            if return_subgraph:
+                ids = self._reserve_xlabel_ids(label, 'e', len(indices))
+                for index, ID in zip(indices, ids):
+                    edge_ids[index] = ID
+                query = self._copy_query(label, ('id', 'start', 'end', 'properties'))
+            else:
+                self._ensure_xlabel(label, 'e')
+                ids = len(indices)*[None]
+                query = self._copy_query(label, ('start', 'end', 'properties'))
+            for offset in range(0, len(indices), partition_size):
+                chunk = indices[offset:offset+partition_size]
+                rows = _edge_copy_rows(ids[offset:offset+partition_size],
+                                       chunk,
+                                       node_ids,
+                                       edge_list,
+                                       edge_attrs,
+                                       edge_properties)
+                edge_partitions.append(agenspy.parallel.CopyPartition('e', query, rows, len(chunk)))
+        tracker = agenspy.parallel._ProgressTracker(G.vcount(), G.ecount(), progress, self.verbose)
+        if workers > 1:
+            # the workers need to see created labels
+            self.commit()
+            with agenspy.parallel.ParallelCopy(self._worker_connection,
+                                               self._release_worker_connection,
+                                               workers,
+                                               _CopyStream) as loader:
+                for partitions in (node_partitions, edge_partitions):
+                    loader.run(partitions, lambda partition: tracker.done(partition.x, partition.n))
+        else:
+            for partition in node_partitions + edge_partitions:
+                self._copy(partition.query, partition.rows)
+                tracker.done(partition.x, partition.n)
+        self.bulk_load_report = BulkLoadReport(G.vcount(), G.ecount(), time.time()-start)
+        if self.verbose:
+            print(self.bulk_load_report)
+        if return_subgraph:
+            nodes = [agenspy.types.GraphVertex(ID, self, label, dict(zip(node_attrs, properties)))
+                     for ID, label, properties in zip(node_ids, node_labels, node_properties)]
+            edges = [agenspy.types.GraphEdge(ID,
+                                             self,
+                                             node_ids[source],
+                                             node_ids[target],
+                                             label,
+                                             dict(zip(edge_attrs, properties)))
+                     for ID, (source, target), label, properties
+                     in zip(edge_ids, edge_list, edge_labels, edge_properties)]
+            return Subgraph(nodes, edges, normalized=True)
+
     @classmethod
     def from_igraph(cls, G, **kwargs):
         graph = cls(**kwargs)
         graph.create_from_igraph(G)
         return graph
 
-    def to_networtkit(self, match=None, where=None):
-        pass
+    def to_networkit(self,
+                     edge_label=None,
+                     edge_property_filter=None,
+                     edge_weight_attr=None,
+                     default_weight=1.0,
+                     directed=True,
+                     return_node_ids=False,
+                     chunk_size=100000):
+        '''
+        NetworKit graph of the edges of a label (all edges if None) and their
+        endpoints, streamed from the label table into arrays without
+        creating GraphEdge instances:
+
+        SELECT start, "end"[, COALESCE((properties->>'w')::float8, default)]
+        FROM graph.label [WHERE properties @> filter];
+
+        Node i of the graph is the vertex with the i-th smallest graphid of
+        the endpoints.
+
+        Args:
+
+            edge_label (str): Default: None (ag_edge). A KeyError is raised
+                              if the graph has no such label
+            edge_property_filter (dict): properties the edges have to match
+            edge_weight_attr (str): numeric edge property holding the weight
+            default_weight (float): weight of edges without edge_weight_attr.
+                                    The graph is unweighted if neither is
+                                    given. Default: 1.0
+            directed (bool): Default: True
+            return_node_ids (bool): also return the graphids of the nodes
+                                    (numpy.ndarray of packed graphids, see
+                                    agenspy.types.GraphId). Default: False
+            chunk_size (int): number of rows per round trip
+
+        Returns:
+
+            networkit.Graph or (networkit.Graph, numpy.ndarray)
+        '''
+      # ------------------ #
+        import numpy as np
+      # ------------------ #
+        if not isinstance(default_weight, numbers.Real):
+            raise TypeError('default_weight has to be a number, not {!r}.'.format(default_weight))
+        if edge_label and not self._has_xlabel(edge_label, 'e'):
+            raise KeyError('No elabel {} in graph {}'.format(edge_label, self.name))
+        weighted = bool(edge_weight_attr) or default_weight != 1.0
+        query, args = self._edge_arrays_query(self._xlabel_table(edge_label if edge_label else 'ag_edge'),
+                                              edge_property_filter,
+                                              edge_weight_attr,
+                                              default_weight if weighted else None)
+        sids = array.array('q')
+        tids = array.array('q')
+        weights = array.array('d')
+        for rows in self._iter_server_side(query, chunk_size, args):
+            sids.extend(row[0] for row in rows)
+            tids.extend(row[1] for row in rows)
+            if weighted:
+                weights.extend(row[2] for row in rows)
+        m = len(sids)
+        endpoints = np.concatenate((np.frombuffer(sids, dtype=np.int64), np.frombuffer(tids, dtype=np.int64)))
+        node_ids, indices = np.unique(endpoints, return_inverse=True)
+        G = _networkit_graph(len(node_ids),
+                             indices[:m],
+                             indices[m:],
+                             np.frombuffer(weights, dtype=np.float64) if weighted else None,
+                             directed)
+        if return_node_ids:
+            return G, node_ids
+        return G
+
+    @classmethod
+    def _edge_arrays_query(cls, edge_table, property_filter=None, weight_attr=None, default_weight=None):
+        query = ['SELECT start, "end"']
+        args = []
+        if weight_attr:
+            query.append(', COALESCE((properties->>%s)::float8, %s)')
+            args.extend([weight_attr, default_weight])
+        elif default_weight is not None:
+            query.append(', %s::float8')
+            args.append(default_weight)
+        query.append(' FROM {}'.format(edge_table))
+        if property_filter:
+            query.append(' WHERE properties @> %s::jsonb')
+            args.append(_properties_json(property_filter))
+        return ''.join(query)+';', args
 
     def create_from_networkit(self, G):
       # ---------------------- #
@@ -427,7 +1821,8 @@ class Graph(agenspy.cursor.Cursor):
       # ----------------------- #
         pass
 
-    def _parse_boolean_exprnmf(self, clause, inner, outer):
+    @classmethod
+    def _parse_boolean_exprnmf(cls, clause, inner, outer):
         if isinstance(clause, str):
             return clause
         inner = '( {} )'.format(inner)
@@ -435,16 +1830,18 @@ class Graph(agenspy.cursor.Cursor):
         clause = [term if isinstance(term, str) else '('+inner.join(term)+')' for term in clause]
         return outer.join(clause)
 
-    def _parse_conjnmf(self, clause):
+    @classmethod
+    def _parse_conjnmf(cls, clause):
         '''
         a --> a
         [a,b,c] --> a AND b AND c
         [a,[b,c],[x,y],z] --> a AND (b OR c) AND (x OR y) AND z
         [[a,b,c],[x,y,z]] --> (a OR b OR c) AND (x OR y OR z)
         '''
-        return self._parse_boolean_exprnmf(clause, 'OR', 'AND')
+        return cls._parse_boolean_exprnmf(clause, 'OR', 'AND')
 
-    def _parse_disjnmf(self, clause):
+    @classmethod
+    def _parse_disjnmf(cls, clause):
         '''
         a --> a
         [a,b,c] --> a OR b OR c
@@ -452,15 +1849,141 @@ class Graph(agenspy.cursor.Cursor):
         [[a,b,c],[x,y,z]] --> (a AND b AND c) OR (x AND y AND z)
 
         '''
-        return self._parse_boolean_exprnmf(clause, 'AND', 'OR')
+        return cls._parse_boolean_exprnmf(clause, 'AND', 'OR')
 
     # -------------------------------------------------------------------------
 
+    def label_of(self, ID):
+        '''
+        Label of the vertex or edge with the given graphid.
+
+        The label id is part of the graphid, so the label is looked up in a
+        cached labid --> labname map of the graph without a round trip. The
+        map is reloaded once if the label id is unknown (e.g. a new label).
+        Label ids still unknown after the reload are remembered as such until
+        the catalog is invalidated, so dangling or foreign graphids cost no
+        further reloads.
+
+        Args:
+
+            ID: agenspy.types.GraphId or graphid as str
+
+        Returns:
+
+            str: name of the label
+        '''
+        labid = agenspy.types.GraphId.of(ID).oid
+        cached = 'label_names' in self._catalog
+        label_names = self._get_label_names()
+        if labid not in label_names and labid not in self._catalog.get('unknown_labids', ()):
+            if cached:
+                self.invalidate_catalog()
+                label_names = self._get_label_names()
+            if labid not in label_names:
+                self._catalog.setdefault('unknown_labids', set()).add(labid)
+        return label_names.get(labid)
+
+    def _get_label_names(self):
+        label_names = self._catalog.get('label_names')
+        if label_names is None:
+            label_names = self._catalog['label_names'] = {labid: labname for labid, _, labname, _
+                                                          in self._catalog_labels()}
+        return label_names
+
     def _get_xlabel_id(self, label_name, x):
-        self.execute("SELECT labid FROM pg_catalog.ag_label "+\
-                     "WHERE graphid = {} AND labname = '{}' AND labkind = '{}';"
+        for reload in (False, True):
+            if reload:
+                self.invalidate_catalog()
+            for labid, _, labname, labkind in self._catalog_labels():
+                if labname == label_name and labkind == x:
+                    return labid
+        raise KeyError('No {}label {} in graph {}'.format(x, label_name, self.name))
+
+    def _xlabel_table(self, label_name):
+        return '{}.{}'.format(psycopg2.extensions.quote_ident(self.name.lower(), self),
+                              psycopg2.extensions.quote_ident(label_name, self))
+
+    def _ensure_xlabel(self, label_name, x):
+        if label_name in ('ag_vertex', 'ag_edge') or label_name in self.xlabels(x):
+            return
+        quoted_name = psycopg2.extensions.quote_ident(label_name, self)
+        if x == 'v':
+            self.create_vlabel(quoted_name, if_not_exists=True)
+        else:
+            self.create_elabel(quoted_name, if_not_exists=True)
+
+    def _get_xlabel_id_default(self, label_name, x):
+        '''
+        The default expression of the id column of a label table, something
+        like: graphid(labid, nextval('graph.label_id_seq'::regclass))
+        '''
+        key = ('id_default', label_name, x)
+        if key in self._catalog:
+            return self._catalog[key]
+        self.execute("SELECT pg_get_expr(defaults.adbin, defaults.adrelid) "+\
+                     "FROM pg_catalog.ag_label AS labels "+\
+                     "INNER JOIN pg_catalog.pg_attribute AS attributes "+\
+                     "ON attributes.attrelid = labels.relid AND attributes.attname = 'id' "+\
+                     "INNER JOIN pg_catalog.pg_attrdef AS defaults "+\
+                     "ON defaults.adrelid = labels.relid AND defaults.adnum = attributes.attnum "+\
+                     "WHERE labels.graphid = {} AND labels.labname = '{}' AND labels.labkind = '{}';"
                      .format(self.graphid, label_name, x))
-        return self.fetchone()[0]
+        default = self._catalog[key] = self.fetchone()[0]
+        return default
+
+    def _reserve_xlabel_ids(self, label_name, x, n):
+        '''
+        Create the label if necessary and draw n ids from its sequence,
+        in one round trip.
+        '''
+        self._ensure_xlabel(label_name, x)
+        default = self._get_xlabel_id_default(label_name, x)
+        self.execute('SELECT {} FROM generate_series(1, {});'.format(default, n))
+        return [row[0] for row in self.fetchall()]
+
+    def _copy_into(self, label_name, columns, rows, size=65536):
+        '''
+        COPY label_name (columns) FROM STDIN; streaming rows (lines in COPY text format).
+        '''
+        self._copy(self._copy_query(label_name, columns), rows, size)
+
+    def _copy_query(self, label_name, columns):
+        columns = ', '.join(psycopg2.extensions.quote_ident(column, self) for column in columns)
+        return 'COPY {} ({}) FROM STDIN'.format(self._xlabel_table(label_name), columns)
+
+    def _copy(self, query, rows, size=65536):
+        started = time.time()
+        self.copy_expert(query, _CopyStream(rows), size)
+        self._log_query(query, started)
+        if self.verbose:
+            print(query)
+
+    def _check_workers(self, workers):
+        '''
+        Further connections can only be opened for graphs from a GraphPool
+        or connected by Graph itself: the DSN of a connection passed via
+        connection=... lacks the password.
+        '''
+        if workers > 1 and self._pool is None and self._connect_kwargs is None:
+            raise ValueError('workers > 1 needs a Graph from a GraphPool or created with '
+                             'connection parameters, not with connection=...')
+
+    def _worker_connection(self):
+        '''
+        A further connection to the database of the graph (for parallel
+        loads): from the pool of the graph or with the connection parameters
+        of the graph, see Graph._check_workers.
+        '''
+        if self._pool is not None:
+            return self._pool.getconn()
+        self._check_workers(2)
+        return psycopg2.connect(**self._connect_kwargs)
+
+    def _release_worker_connection(self, connection):
+        if self._pool is not None:
+            self._pool.putconn(connection)
+        else:
+            connection.close()
 
     def _get_vlabel_id(self, label_name):
         return self._get_xlabel_id(label_name, 'v')
@@ -468,7 +1991,12 @@ class Graph(agenspy.cursor.Cursor):
     def _get_elabel_id(self, label_name):
         return self._get_xlabel_id(label_name, 'e')
 
+    _catalog_columns = {'labid': 0, 'relid': 1, 'labname': 2, 'labkind': 3}
+
     def _get_xlabel_y(self, x, y):
+        column = self._catalog_columns.get(y)
+        if column is not None:
+            return {label[column]: label[2] for label in self._catalog_labels() if label[3] == x}
         self.execute("SELECT {}, labname FROM pg_catalog.ag_label "
                      .format(y)+\
                      "WHERE graphid = {} and labkind = '{}';"
@@ -491,15 +2019,24 @@ class Graph(agenspy.cursor.Cursor):
         return {v: k for k,v in d.items()}
 
     def _get_xlabel_inheritance(self, x):
+        key = ('inheritance', x)
+        if key not in self._catalog:
+            self._catalog[key] = self._load_xlabel_inheritance(x)
+        return list(self._catalog[key])
+
+    def _load_xlabel_inheritance(self, x):
         relid2name = self._get_xlabel_y(x, y='relid')
-        self.execute("SELECT inhparent, relid "+\
-                     "FROM pg_catalog.ag_label AS labels "+\
-                     "INNER JOIN pg_catalog.pg_inherits AS inheritance "+\
-                     "ON labels.relid = inheritance.inhrelid "+\
-                     "AND labels.labkind = '{}' AND labels.graphid = {};"
-                     .format(x, self.graphid))
+        self.execute(self._xlabel_inheritance_query(x, self.graphid))
         return [(relid2name[p], relid2name[c]) for p, c in self.fetchall()]
 
+    @classmethod
+    def _xlabel_inheritance_query(cls, x, graphid):
+        return "SELECT inhparent, relid "+\
+               "FROM pg_catalog.ag_label AS labels "+\
+               "INNER JOIN pg_catalog.pg_inherits AS inheritance "+\
+               "ON labels.relid = inheritance.inhrelid "+\
+               "AND labels.labkind = '{}' AND labels.graphid = {};".format(x, graphid)
+
     @property
     def vlabel_inheritance(self):
         return self._get_xlabel_inheritance(x='v')
@@ -519,6 +2056,216 @@ class Graph(agenspy.cursor.Cursor):
     def print_elabel_inheritance(self):
         self.print_xlabel_inheritance(x='e')
 
+################################################################################
+# GraphBatch (class) ###########################################################
+################################################################################
+
+class GraphBatch:
+    '''
+    Unit of work queueing node and edge creations of a Graph, see Graph.batch.
+    '''
+
+    def __init__(self, graph, size=1000, commit=True):
+        self._graph = graph
+        self.size = size
+        self._commit = commit
+        self._nodes = []
+        self._edges = []
+        self.nodes_flushed = 0
+        self.edges_flushed = 0
+
+    def __len__(self):
+        return len(self._nodes) + len(self._edges)
+
+    def create_node(self, label=None, properties={}, **kwargs):
+        '''
+        Queue a node, see Graph.create_node.
+
+        Returns:
+
+            agenspy.types.GraphVertex: placeholder whose id is None until
+                                       the batch is flushed
+        '''
+        vertex = agenspy.types.GraphVertex(None, self._graph, label, { **properties, **kwargs })
+        self._nodes.append(vertex)
+        self._flush_if_full()
+        return vertex
+
+    def create_edge(self, source, relation=None, target=None, properties={}, **kwargs):
+        '''
+        Queue an edge (a self loop if target is None), see Graph.create_edge.
+        source and target may be placeholders of queued nodes.
+
+        Returns:
+
+            agenspy.types.GraphEdge: placeholder whose id, sid and tid are
+                                     None until the batch is flushed
+        '''
+        target = source if target is None else target
+        edge = agenspy.types.GraphEdge(None, self._graph, None, None, relation, { **properties, **kwargs })
+        self._edges.append((edge, source, target))
+        self._flush_if_full()
+        return edge
+
+    def create_self_loop(self, node, relation=None, properties={}, **kwargs):
+        return self.create_edge(node, relation, None, properties, **kwargs)
+
+    def _flush_if_full(self):
+        if len(self) >= self.size:
+            self.flush()
+
+    def flush(self):
+        '''
+        Create the queued nodes and then the queued edges with multi-row
+        statements (Graph.create_nodes, Graph.create_edges), resolve the
+        placeholders and commit if the batch was opened with commit=True.
+
+        If the flush fails, the nodes and edges stay queued (with unresolved
+        placeholders), so it can be retried after Graph.rollback.
+
+        Returns:
+
+            GraphBatch
+        '''
+        queued = {id(vertex) for vertex in self._nodes}
+        for _, source, target in self._edges:
+            for endpoint in (source, target):
+                if endpoint.id is None and id(endpoint) not in queued:
+                    raise ValueError('Edge endpoint is a placeholder of no (flushed) batch.')
+        nodes, self._nodes = self._nodes, []
+        edges, self._edges = self._edges, []
+        try:
+            self._create(nodes, edges)
+        except:
+            for placeholder in nodes:
+                placeholder._id = None
+            for placeholder, _, _ in edges:
+                placeholder._id = placeholder._sid = placeholder._tid = None
+            self._nodes = nodes + self._nodes
+            self._edges = edges + self._edges
+            raise
+        self.nodes_flushed += len(nodes)
+        self.edges_flushed += len(edges)
+        return self
+
+    def _create(self, nodes, edges):
+        if nodes:
+            created = self._graph.create_nodes(len(nodes),
+                                               [vertex._label for vertex in nodes],
+                                               [dict(vertex) for vertex in nodes],
+                                               page_size=self.size)
+            for placeholder, vertex in zip(nodes, created):
+                placeholder._id = vertex.id
+                placeholder._label = vertex._label
+        if edges:
+            created = self._graph.create_edges([(source, target) for _, source, target in edges],
+                                               [edge._label for edge, _, _ in edges],
+                                               [dict(edge) for edge, _, _ in edges],
+                                               page_size=self.size)
+            for (placeholder, _, _), edge in zip(edges, created):
+                placeholder._id = edge.id
+                placeholder._sid = edge.sid
+                placeholder._tid = edge.tid
+                placeholder._label = edge._label
+        if self._commit and (nodes or edges):
+            self._graph.commit()
+
+    def discard(self):
+        '''
+        Drop all queued, not yet flushed creations.
+        '''
+        self._nodes = []
+        self._edges = []
+        return self
+
+    def __enter__(self):
+        if self._graph._batch is not None:
+            raise RuntimeError('Graph.batch contexts can not be nested.')
+        self._graph._batch = self
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self._graph._batch = None
+        if exc_type is None:
+            self.flush()
+        else:
+            self.discard()
+
+
+################################################################################
+# Neighborhoods (class) ########################################################
+################################################################################
+
+class Neighborhoods:
+    '''
+    Result of Graph.neighborhoods: the union of the neighborhoods as a packed
+    array of vertex ids and, per seed, a compact array of indices into it.
+    '''
+
+    def __init__(self, seeds, seed_bits, distances, masks, subgraph=None):
+        self.seeds = list(seeds)
+        self.vertex_ids = array.array('q', distances)
+        self.distances = array.array('i', distances.values())
+        self.subgraph = subgraph
+        bit2members = collections.defaultdict(lambda: array.array('i'))
+        for index, ID in enumerate(distances):
+            mask = masks[ID]
+            while mask:
+                low = mask & -mask
+                bit2members[low.bit_length()-1].append(index)
+                mask ^= low
+        self._members = []
+        for bits in seed_bits:
+            if len(bits) == 1:
+                members = bit2members[bits[0]]
+            else:
+                members = array.array('i', sorted({index for bit in bits for index in bit2members[bit]}))
+            self._members.append(members)
+        self._seed_index = {}
+        for index, seed in enumerate(self.seeds):
+            self._seed_index.setdefault(seed, index)
+
+    def __len__(self):
+        return len(self.seeds)
+
+    def __iter__(self):
+        return iter(self.seeds)
+
+    def __getitem__(self, seed):
+        '''
+        Indices into Neighborhoods.vertex_ids of the neighborhood of seed
+        (including the seed vertices themselves).
+        '''
+        return self._members[self._index(seed)]
+
+    def _index(self, seed):
+        index = self._seed_index.get(seed)
+        if index is None:
+            try:
+                index = self._seed_index.get(agenspy.types.GraphId.of(seed))
+            except (TypeError, ValueError):
+                index = None
+            if index is None:
+                raise KeyError(seed)
+        return index
+
+    def ids(self, seed):
+        '''
+        Graphids of the neighborhood of seed.
+        '''
+        vertex_ids = self.vertex_ids
+        return [agenspy.types.GraphId(vertex_ids[index]) for index in self[seed]]
+
+    def sizes(self):
+        '''
+        Size of every neighborhood, in the order of Neighborhoods.seeds.
+        '''
+        return array.array('i', (len(members) for members in self._members))
+
+    @property
+    def nv(self):
+        return len(self.vertex_ids)
+
 
 class Subgraph:
 
@@ -543,6 +2290,16 @@ class Subgraph:
     def cached_edge_property_keys(self):
         return {key for edge in self.edges for key in edge}
 
+    def prefetch(self, keys=None, nodes=True, edges=True):
+        '''
+        Load the given property keys (all properties if None) of all nodes
+        and/or edges into their caches, see Graph.fetch_properties.
+        '''
+        entities = (self.nodes if nodes else []) + (self.edges if edges else [])
+        if entities:
+            agenspy.types._fetch_properties(entities[0].graph, entities, keys)
+        return self
+
     def add(entity):
         if isinstance(entity, list):
             for e in entity:
@@ -612,32 +2369,38 @@ class Subgraph:
             self.normalize()
         node_property_prefix = node_property_prefix+'_' if node_property_prefix else ''
         edge_property_prefix = edge_property_prefix+'_' if edge_property_prefix else ''
+        # uncached properties: fetch them in bulk and then work on the cache
+        if not cached_node_properties:
+            self.prefetch(node_properties if node_properties else None, edges=False)
+            cached_node_properties = True
+        if not cached_edge_properties:
+            self.prefetch(edge_properties if edge_properties else None, nodes=False)
+            cached_edge_properties = True
+        # vertices: labels, id --> index map and property columns in one pass
+        nodes = self.nodes
+        node_labels, node_columns = _label_and_property_columns(nodes,
+                                                                expand_node_properties and cached_node_properties)
+        id2index = {node.id: index for index, node in enumerate(nodes)}
+        # edges: edge list, labels and property columns in one pass
+        edges = self.edges
+        edge_list = [(id2index[edge.sid], id2index[edge.tid]) for edge in edges]
+        edge_labels, edge_columns = _label_and_property_columns(edges,
+                                                                expand_edge_properties and cached_edge_properties)
         # graph
-        G = ig.Graph(directed=directed)
-        # vertices
-        G.add_vertices(len(self))
-        G.vs[node_label] = [node.label for node in self.nodes]
+        G = ig.Graph(n=len(nodes), edges=edge_list, directed=directed)
+        G.vs[node_label] = node_labels
         if expand_node_properties:
-            if cached_node_properties:
-                for prop in self.cached_node_property_keys:
-                    G.vs[node_property_prefix+prop] = [node.get(prop) for node in self.nodes]
-            else:
-                pass
+            for prop, column in node_columns.items():
+                G.vs[node_property_prefix+prop] = column
         else:
-            G.vs[node_property_prefix+'properties'] = [node.properties(cached_node_properties) for node in self.nodes]
-        # edges
-        id2index = {node.id: index for index, node in enumerate(self.nodes)}
-        G.add_edges([(id2index[e.sid], id2index[e.tid]) for e in self.edges])
-        G.es[edge_label] = [edge.label for edge in self.edges]
+            G.vs[node_property_prefix+'properties'] = [node.properties(cached_node_properties) for node in nodes]
+        G.es[edge_label] = edge_labels
         if expand_edge_properties:
-            if cached_edge_properties:
-                for prop in self.cached_edge_property_keys:
-                    G.es[edge_property_prefix+prop] = [edge.get(prop) for edge in self.edges]
-            else:
-                pass
+            for prop, column in edge_columns.items():
+                G.es[edge_property_prefix+prop] = column
         else:
-            G.es[edge_property_prefix+'properties'] = [edge.properties(cached_edge_properties) for edge in self.edges]
-        # ------ 
+            G.es[edge_property_prefix+'properties'] = [edge.properties(cached_edge_properties) for edge in edges]
+        # ------
         return G
 
     def to_networkx(self,
@@ -649,8 +2412,28 @@ class Subgraph:
                     expand_edge_properties=False,
                     edge_label='label',
                     edge_property_prefix=None,
-                    directed=True):
+                    directed=True,
+                    copy_properties=True):
         '''
+        Nodes are keyed by their graphid, edges by their graphid as well
+        (the key of the multi-edge).
+
+        Args:
+
+            expand_*_properties (bool): one attribute per property (named
+                                        *_property_prefix_key) instead of a
+                                        single *_property_prefix_properties
+                                        dict attribute
+            copy_properties (bool): if False, the properties attribute of
+                                    a node (edge) is the GraphVertex
+                                    (GraphEdge) itself instead of a copy of
+                                    its properties, so that no dict has to
+                                    be built per entity. Has no effect on
+                                    expanded properties. Default: True
+
+        Returns:
+
+            networkx.MultiDiGraph (networkx.MultiGraph if not directed)
         '''
       # --------------------- #
         import networkx as nx
@@ -658,13 +2441,25 @@ class Subgraph:
         # prepare
         if not self.normalized:
             self.normalize()
-        nodes = list(self.nodes)
-        edges = list(self.edges)
         node_property_prefix = node_property_prefix+'_' if node_property_prefix else ''
         edge_property_prefix = edge_property_prefix+'_' if edge_property_prefix else ''
+        # uncached properties: fetch them in bulk and then work on the cache
+        if not cached_node_properties:
+            self.prefetch(edges=False)
+        if not cached_edge_properties:
+            self.prefetch(nodes=False)
+        # attribute dicts, built once per entity and handed over in bulk
+        nodes = [(node.id, _networkx_attributes(node, node_label, node_property_prefix,
+                                                expand_node_properties, copy_properties))
+                 for node in self.nodes]
+        edges = [(edge.sid, edge.tid, edge.id,
+                  _networkx_attributes(edge, edge_label, edge_property_prefix,
+                                       expand_edge_properties, copy_properties))
+                 for edge in self.edges]
         # networkx graph
         G = nx.MultiDiGraph() if directed else nx.MultiGraph()
-
+        G.add_nodes_from(nodes)
+        G.add_edges_from(edges)
         # ------
         return G
 
@@ -673,32 +2468,44 @@ class Subgraph:
                      edge_weight_attr=None,
                      default_weight=1.0):
         '''
+        NetworKit graph whose node i is Subgraph.nodes[i], built in one go
+        from source, target (and weight) arrays.
+
+        Args:
+
+            directed (bool): Default: True
+            edge_weight_attr (str): edge property holding the weight
+            default_weight (float): weight of edges without edge_weight_attr.
+                                    The graph is unweighted if neither is
+                                    given. Default: 1.0
 
+        Returns:
+
+            networkit.Graph
         '''
-      # ---------------------- #
-        import networkit as nk
-      # ---------------------- #
+      # ------------------ #
+        import numpy as np
+      # ------------------ #
         if not self.normalized:
             self.normalize()
-        # networkit graph
-        weight_flag = False if edge_weight_attr is None and default_weight == 1.0 else True
-        G = nk.graph.Graph(len(self.nodes), weight_flag, directed)
-        nodeid2index = {node.id: index for index, node in enumerate(self.nodes)}
+        nodes = self.nodes
+        edges = self.edges
+        nodeid2index = {node.id: index for index, node in enumerate(nodes)}
+        sources = np.fromiter((nodeid2index[edge.sid] for edge in edges), np.uint64, len(edges))
+        targets = np.fromiter((nodeid2index[edge.tid] for edge in edges), np.uint64, len(edges))
         # weights
+        weights = None
         if edge_weight_attr:
-            weights = [edge.get(edge_weight_attr) for edge in self.edges]
-            weights = [default_weight if w is None else w for w in weights]
-        elif edge_weight_attr is None and default_weight != 1.0:
-            weights = len(self.edges) * [default_weight]
-        # add edges
-        if weight_flag:
-            for i, edge in enumerate(self.edges):
-                G.addEdge(nodeid2index[edge.sid], nodeid2index[edge.tid], weights[i])
-        else:
-            for edge in self.edges:
-                G.addEdge(nodeid2index[edge.sid], nodeid2index[edge.tid])
+            # uncached weights: fetch them in bulk rather than edge by edge
+            uncached = [edge for edge in edges if edge_weight_attr not in edge]
+            if uncached:
+                agenspy.types._fetch_properties(uncached[0].graph, uncached, [edge_weight_attr])
+            weights = np.fromiter((_weight(edge.get(edge_weight_attr), default_weight) for edge in edges),
+                                  np.float64, len(edges))
+        elif default_weight != 1.0:
+            weights = np.full(len(edges), default_weight, np.float64)
         # ------
-        return G
+        return _networkit_graph(len(nodes), sources, targets, weights, directed)
 
     def to_graphtool(self):
       # ----------------------- #
@@ -714,3 +2521,341 @@ class Subgraph:
 
     def graphtool_property(self, *args, **kwargs):
         pass
+
+
+################################################################################
+# ColumnarSubgraph (class) #####################################################
+################################################################################
+
+class _ColumnBuilder:
+    '''
+    Accumulates entities column by column: packed graphids, label codes
+    and one list per property key.
+    '''
+
+    def __init__(self):
+        self.ids = array.array('q')
+        self.codes = array.array('H')
+        self.label_names = []
+        self.properties = {}
+        self._label_codes = {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add(self, ID, label, properties):
+        n = len(self.ids)
+        self.ids.append(agenspy.types._pack_graphid(ID))
+        code = self._label_codes.get(label)
+        if code is None:
+            code = self._label_codes[label] = len(self.label_names)
+            self.label_names.append(label)
+        self.codes.append(code)
+        for key, value in properties.items():
+            column = self.properties.get(key)
+            if column is None:
+                column = self.properties[key] = []
+            if len(column) < n:
+                column.extend((n-len(column))*[None])
+            column.append(value)
+
+    def finish(self):
+        n = len(self.ids)
+        for column in self.properties.values():
+            if len(column) < n:
+                column.extend((n-len(column))*[None])
+        return self
+
+
+class _LazyEntities(collections.abc.Sequence):
+    '''
+    Sequence view materializing GraphVertex/GraphEdge instances on access.
+    '''
+
+    def __init__(self, n, make):
+        self._n = n
+        self._make = make
+
+    def __len__(self):
+        return self._n
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._make(i) for i in range(*index.indices(self._n))]
+        if index < 0:
+            index += self._n
+        if not 0 <= index < self._n:
+            raise IndexError('entity index out of range')
+        return self._make(index)
+
+
+class ColumnarSubgraph(Subgraph):
+    '''
+    Compact, columnar Subgraph representation.
+
+    Vertex and edge ids are stored as packed 64-bit graphids, sources and
+    targets as int32 positions into the vertex columns, labels as categorical
+    codes and properties as one list per key. GraphVertex and GraphEdge
+    instances are only created when nodes or edges are accessed.
+
+    Construct via Graph.subgraph(..., columnar=True).
+    '''
+
+    def __init__(self, graph, nodes, edges, sources, targets):
+        '''
+        Args:
+
+            graph (Graph): the graph the entities belong to
+            nodes (_ColumnBuilder): vertex columns
+            edges (_ColumnBuilder): edge columns
+            sources (array.array): position of the source vertex of each edge
+            targets (array.array): position of the target vertex of each edge
+        '''
+        self._graph = graph
+        self._node_columns = nodes
+        self._edge_columns = edges
+        self._sources = sources
+        self._targets = targets
+        self._normalized = True
+
+    @classmethod
+    def _from_rows(cls, graph, edge_rows, node_rows):
+        '''
+        Args:
+
+            edge_rows: iterable of (id(e), id(s), id(t), type(e), properties(e))
+            node_rows: iterable of (id(v), label(v), properties(v))
+        '''
+        edges = _ColumnBuilder()
+        sids = array.array('q')
+        tids = array.array('q')
+        for ID, sid, tid, label, properties in edge_rows:
+            edges.add(ID, label, properties)
+            sids.append(agenspy.types._pack_graphid(sid))
+            tids.append(agenspy.types._pack_graphid(tid))
+        nodes = _ColumnBuilder()
+        for ID, label, properties in node_rows:
+            nodes.add(ID, label, properties)
+        position = {ID: index for index, ID in enumerate(nodes.ids)}
+        try:
+            sources = array.array('i', (position[sid] for sid in sids))
+            targets = array.array('i', (position[tid] for tid in tids))
+        except KeyError as error:
+            missing = agenspy.types._unpack_graphid(error.args[0])
+            raise ValueError('Edge endpoint {} is not among the node rows.'.format(missing)) from None
+        return cls(graph, nodes.finish(), edges.finish(), sources, targets)
+
+    @property
+    def graph(self):
+        return self._graph
+
+    # ----- column access ----------------------------------------------------
+
+    @property
+    def node_ids(self):
+        return self._node_columns.ids
+
+    @property
+    def node_label_codes(self):
+        return self._node_columns.codes
+
+    @property
+    def node_label_names(self):
+        return self._node_columns.label_names
+
+    @property
+    def node_property_columns(self):
+        return self._node_columns.properties
+
+    @property
+    def edge_ids(self):
+        return self._edge_columns.ids
+
+    @property
+    def sources(self):
+        return self._sources
+
+    @property
+    def targets(self):
+        return self._targets
+
+    @property
+    def edge_label_codes(self):
+        return self._edge_columns.codes
+
+    @property
+    def edge_label_names(self):
+        return self._edge_columns.label_names
+
+    @property
+    def edge_property_columns(self):
+        return self._edge_columns.properties
+
+    # ----- lazy entities ----------------------------------------------------
+
+    def _row_properties(self, columns, index):
+        return {key: column[index] for key, column in columns.properties.items()
+                if column[index] is not None}
+
+    def node(self, index):
+        columns = self._node_columns
+        return agenspy.types.GraphVertex(agenspy.types._unpack_graphid(columns.ids[index]),
+                                         self._graph,
+                                         columns.label_names[columns.codes[index]],
+                                         self._row_properties(columns, index))
+
+    def edge(self, index):
+        columns = self._edge_columns
+        node_ids = self._node_columns.ids
+        return agenspy.types.GraphEdge(agenspy.types._unpack_graphid(columns.ids[index]),
+                                       self._graph,
+                                       agenspy.types._unpack_graphid(node_ids[self._sources[index]]),
+                                       agenspy.types._unpack_graphid(node_ids[self._targets[index]]),
+                                       columns.label_names[columns.codes[index]],
+                                       self._row_properties(columns, index))
+
+    @property
+    def nodes(self):
+        return _LazyEntities(len(self._node_columns), self.node)
+
+    @property
+    def edges(self):
+        return _LazyEntities(len(self._edge_columns), self.edge)
+
+    @property
+    def cached_node_property_keys(self):
+        return set(self._node_columns.properties)
+
+    @property
+    def cached_edge_property_keys(self):
+        return set(self._edge_columns.properties)
+
+    @property
+    def is_normalized(self):
+        return True
+
+    def prefetch(self, keys=None, nodes=True, edges=True):
+        '''
+        All properties are held in the columns already.
+        '''
+        return self
+
+    def normalize(self):
+        pass
+
+    def __len__(self):
+        return len(self._node_columns)
+
+    # ----- conversions ------------------------------------------------------
+
+    def _property_dicts(self, columns):
+        return [self._row_properties(columns, index) for index in range(len(columns))]
+
+    def to_igraph(self,
+                  node_properties=[],
+                  cached_node_properties=True,
+                  expand_node_properties=False,
+                  node_label='label',
+                  node_property_prefix=None,
+                  edge_properties=[],
+                  cached_edge_properties=True,
+                  expand_edge_properties=False,
+                  edge_label='label',
+                  edge_property_prefix=None,
+                  directed=True):
+        '''
+        See Subgraph.to_igraph. All properties are held in the columns, so
+        the cached_*_properties flags have no effect.
+        '''
+      # ------------------- #
+        import igraph as ig
+      # ------------------- #
+        node_property_prefix = node_property_prefix+'_' if node_property_prefix else ''
+        edge_property_prefix = edge_property_prefix+'_' if edge_property_prefix else ''
+        nodes = self._node_columns
+        edges = self._edge_columns
+        G = ig.Graph(n=len(nodes), edges=list(zip(self._sources, self._targets)), directed=directed)
+        G.vs[node_label] = [nodes.label_names[code] for code in nodes.codes]
+        if expand_node_properties:
+            for key, column in nodes.properties.items():
+                G.vs[node_property_prefix+key] = column
+        else:
+            G.vs[node_property_prefix+'properties'] = self._property_dicts(nodes)
+        G.es[edge_label] = [edges.label_names[code] for code in edges.codes]
+        if expand_edge_properties:
+            for key, column in edges.properties.items():
+                G.es[edge_property_prefix+key] = column
+        else:
+            G.es[edge_property_prefix+'properties'] = self._property_dicts(edges)
+        # ------
+        return G
+
+    def to_networkx(self,
+                    cached_node_properties=True,
+                    expand_node_properties=False,
+                    node_label='label',
+                    node_property_prefix=None,
+                    cached_edge_properties=True,
+                    expand_edge_properties=False,
+                    edge_label='label',
+                    edge_property_prefix=None,
+                    directed=True,
+                    copy_properties=True):
+        '''
+        See Subgraph.to_networkx. All properties are held in the columns, so
+        the cached_*_properties and copy_properties flags have no effect.
+        '''
+      # --------------------- #
+        import networkx as nx
+      # --------------------- #
+        node_property_prefix = node_property_prefix+'_' if node_property_prefix else ''
+        edge_property_prefix = edge_property_prefix+'_' if edge_property_prefix else ''
+        node_ids = [agenspy.types._unpack_graphid(ID) for ID in self._node_columns.ids]
+        edge_ids = [agenspy.types._unpack_graphid(ID) for ID in self._edge_columns.ids]
+        node_attributes = self._networkx_attributes(self._node_columns, node_label,
+                                                    node_property_prefix, expand_node_properties)
+        edge_attributes = self._networkx_attributes(self._edge_columns, edge_label,
+                                                    edge_property_prefix, expand_edge_properties)
+        G = nx.MultiDiGraph() if directed else nx.MultiGraph()
+        G.add_nodes_from(zip(node_ids, node_attributes))
+        G.add_edges_from((node_ids[source], node_ids[target], ID, attributes)
+                         for source, target, ID, attributes
+                         in zip(self._sources, self._targets, edge_ids, edge_attributes))
+        # ------
+        return G
+
+    def _networkx_attributes(self, columns, label_attr, prefix, expand):
+        labels = [columns.label_names[code] for code in columns.codes]
+        if not expand:
+            return [{label_attr: label, prefix+'properties': properties}
+                    for label, properties in zip(labels, self._property_dicts(columns))]
+        attributes = [{label_attr: label} for label in labels]
+        for key, column in columns.properties.items():
+            name = prefix+key
+            for index, value in enumerate(column):
+                if value is not None:
+                    attributes[index][name] = value
+        return attributes
+
+    def to_networkit(self,
+                     directed=True,
+                     edge_weight_attr=None,
+                     default_weight=1.0):
+        '''
+        See Subgraph.to_networkit. The source and target columns are handed
+        over as they are.
+        '''
+      # ------------------ #
+        import numpy as np
+      # ------------------ #
+        m = len(self._edge_columns)
+        sources = np.frombuffer(self._sources, dtype=np.int32)
+        targets = np.frombuffer(self._targets, dtype=np.int32)
+        weights = None
+        column = self._edge_columns.properties.get(edge_weight_attr) if edge_weight_attr else None
+        if column is not None:
+            weights = np.fromiter((_weight(weight, default_weight) for weight in column), np.float64, m)
+        elif edge_weight_attr or default_weight != 1.0:
+            weights = np.full(m, default_weight, np.float64)
+        # ------
+        return _networkit_graph(len(self), sources, targets, weights, directed)
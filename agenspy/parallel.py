@@ -0,0 +1,176 @@
+'''
+This module provides the machinery for parallel bulk imports: COPY partitions
+are loaded concurrently on several connections to the database, see
+Graph.create_from_igraph(..., workers=...).
+
+Workers are threads, each with its own connection. psycopg2 releases the GIL
+while talking to the server, and the server side of a COPY (parsing, heap
+and index inserts, WAL) dominates an import, so threads keep several server
+backends busy without pickling the data to worker processes.
+'''
+
+import collections
+import concurrent.futures
+import threading
+import time
+
+################################################################################
+# ImportProgress (class) #######################################################
+################################################################################
+
+class ImportProgress(collections.namedtuple('ImportProgress',
+                                            ['nodes', 'nodes_total',
+                                             'edges', 'edges_total',
+                                             'seconds'])):
+    '''
+    Progress of a bulk import, passed to the progress callback of
+    Graph.create_from_igraph after every loaded partition.
+    '''
+
+    @property
+    def rows(self):
+        return self.nodes + self.edges
+
+    @property
+    def rows_total(self):
+        return self.nodes_total + self.edges_total
+
+    @property
+    def fraction(self):
+        return self.rows / self.rows_total if self.rows_total else 1.0
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds > 0 else float('inf')
+
+    def __str__(self):
+        return '{}/{} nodes, {}/{} edges ({:.0%}) in {:.2f} seconds ({:.0f} rows/sec)'\
+               .format(self.nodes, self.nodes_total, self.edges, self.edges_total,
+                       self.fraction, self.seconds, self.rows_per_second)
+
+
+class _ProgressTracker:
+    '''
+    Counts loaded rows and reports ImportProgress to a callback.
+    '''
+
+    def __init__(self, nodes_total, edges_total, callback=None, verbose=False):
+        self._started = time.time()
+        self._nodes_total = nodes_total
+        self._edges_total = edges_total
+        self._callback = callback
+        self._verbose = verbose
+        self.nodes = 0
+        self.edges = 0
+
+    def done(self, x, n):
+        if x == 'v':
+            self.nodes += n
+        else:
+            self.edges += n
+        if self._callback is None and not self._verbose:
+            return
+        progress = ImportProgress(self.nodes,
+                                  self._nodes_total,
+                                  self.edges,
+                                  self._edges_total,
+                                  time.time()-self._started)
+        if self._callback is not None:
+            self._callback(progress)
+        if self._verbose:
+            print(progress)
+
+################################################################################
+# CopyPartition (class) ########################################################
+################################################################################
+
+class CopyPartition(collections.namedtuple('CopyPartition', ['x', 'query', 'rows', 'n'])):
+    '''
+    A COPY ... FROM STDIN query, its rows (lines in COPY text format, possibly
+    a generator), the kind of rows x ('v' or 'e') and their number n.
+    '''
+
+################################################################################
+# ParallelCopy (class) #########################################################
+################################################################################
+
+class ParallelCopy:
+
+    def __init__(self, connect, release, workers, copy_stream, size=65536):
+        '''
+        Args:
+
+            connect: function returning a new connection
+            release: function taking back a connection returned by connect
+            workers (int): number of worker threads (and connections)
+            copy_stream: function wrapping rows into a file-like object
+            size (int): read size of copy_expert
+        '''
+        self._connect = connect
+        self._release = release
+        self._workers = workers
+        self._copy_stream = copy_stream
+        self._size = size
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = self._connect()
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def _load(self, partition):
+        connection = self._connection()
+        try:
+            with connection.cursor() as cursor:
+                cursor.copy_expert(partition.query, self._copy_stream(partition.rows), self._size)
+            connection.commit()
+        except:
+            connection.rollback()
+            raise
+        return partition
+
+    def run(self, partitions, done=None):
+        '''
+        Load all partitions concurrently, every partition is committed on
+        its own. If a partition fails, pending partitions are cancelled and
+        the error is raised, already committed partitions remain.
+
+        Args:
+
+            partitions (list): CopyPartition instances
+            done: function called with every loaded partition (in the
+                  calling thread)
+        '''
+        futures = [self._executor.submit(self._load, partition) for partition in partitions]
+        try:
+            for future in concurrent.futures.as_completed(futures):
+                partition = future.result()
+                if done is not None:
+                    done(partition)
+        except:
+            for future in futures:
+                future.cancel()
+            concurrent.futures.wait(futures)
+            raise
+
+    def close(self):
+        '''
+        Stop the workers and release their connections.
+        '''
+        self._executor.shutdown()
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            self._release(connection)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,142 @@
+'''
+This module provides the GraphPool class, a thread-safe pool of connections
+to an AgensGraph database handing out Graph and Cursor instances.
+
+Connection setup (connecting, CREATE GRAPH IF NOT EXISTS, the graph id lookup
+and SET graph_path) is done once per connection and graph instead of once per
+Graph:
+
+    > pool = GraphPool(minconn=1, maxconn=8, dbname='test')
+    > with pool.graph('kegg') as kegg:
+    >     kegg.numv('gene')
+'''
+
+import getpass
+import threading
+import weakref
+
+import psycopg2
+import psycopg2.pool
+
+import agenspy.cursor
+import agenspy.graph
+
+################################################################################
+# GraphPool (class) ############################################################
+################################################################################
+
+class GraphPool:
+
+    def __init__(self, minconn=1, maxconn=10, host='127.0.0.1', port='5432', **kwargs):
+        '''
+        Args:
+
+            minconn (int): number of connections opened upfront
+            maxconn (int): maximum number of connections
+            host (str): database host
+            port (str): database port
+
+        All other kwargs will be passed to psycopg2.connect.
+        '''
+        self._pool = psycopg2.pool.ThreadedConnectionPool(minconn,
+                                                          maxconn,
+                                                          host=host,
+                                                          port=port,
+                                                          **kwargs)
+        self._user = kwargs.get('user', getpass.getuser())
+        self._lock = threading.Lock()
+        self._graphids = {}                               # graph name --> graphid
+        self._graph_paths = weakref.WeakKeyDictionary()   # connection --> graph_path
+
+    def graph(self, graph_name, authorization=None, **kwargs):
+        '''
+        A Graph on a pooled connection. Its close method returns the
+        connection to the pool, uncommitted work is rolled back.
+
+        Args:
+
+            graph_name (str): name of the graph
+            authorization (str): owner of the graph if it has to be created
+
+        All other kwargs are passed to Graph (e.g. cursor_name, replace,
+        lazy_properties).
+
+        Returns:
+
+            agenspy.graph.Graph
+        '''
+        connection = self._pool.getconn()
+        try:
+            return agenspy.graph.Graph(graph_name,
+                                       authorization=authorization or self._user,
+                                       connection=connection,
+                                       pool=self,
+                                       **kwargs)
+        except:
+            self.putconn(connection)
+            raise
+
+    def cursor(self, name=None, verbose=False):
+        '''
+        A Cursor on a pooled connection, see GraphPool.graph.
+
+        Returns:
+
+            agenspy.cursor.Cursor
+        '''
+        return agenspy.cursor.Cursor(self._pool.getconn(), name, verbose, pool=self)
+
+    def getconn(self):
+        '''
+        A plain connection from the pool, to be returned via putconn.
+        '''
+        return self._pool.getconn()
+
+    def putconn(self, connection, close=False):
+        '''
+        Return a connection to the pool. An open transaction is rolled back.
+        '''
+        if close:
+            self._forget_graph_path(connection)
+        self._pool.putconn(connection, close=close)
+
+    def closeall(self):
+        '''
+        Close all connections of the pool.
+        '''
+        self._pool.closeall()
+
+    @property
+    def closed(self):
+        return self._pool.closed
+
+    def forget_graph(self, graph_name):
+        '''
+        Forget a known graph, e.g. after it has been dropped elsewhere.
+        The next GraphPool.graph(graph_name) creates and looks it up again.
+        '''
+        with self._lock:
+            self._graphids.pop(graph_name, None)
+
+    def _get_graphid(self, graph_name):
+        with self._lock:
+            return self._graphids.get(graph_name)
+
+    def _get_graph_path(self, connection):
+        with self._lock:
+            return self._graph_paths.get(connection)
+
+    def _forget_graph_path(self, connection):
+        with self._lock:
+            self._graph_paths.pop(connection, None)
+
+    def _set_graph(self, connection, graph_name, graphid):
+        with self._lock:
+            self._graphids[graph_name] = graphid
+            self._graph_paths[connection] = graph_name
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.closeall()
@@ -0,0 +1,251 @@
+'''
+This module provides instrumentation for queries run through agenspy cursors
+(agenspy.cursor.Cursor, agenspy.graph.Graph).
+
+A Profiler attached to a cursor (or to all cursors via Cursor.profiler)
+measures every executed query and hands a QueryEvent to its callbacks:
+
+    > profiler = Profiler(explain_threshold=0.5)
+    > profiler.add_callback(lambda event: print(event.seconds, event.template))
+    > graph.set_profiler(profiler)
+    > ...
+    > for template, stats in profiler.stats.top(10):
+    >     print(stats.seconds, stats.calls, template)
+
+Vertices and edges are decoded by the psycopg2 casters when rows are fetched,
+not when the query is executed. Events of queries returning rows are hence
+completed (and passed to the callbacks) when the next query is executed on
+the cursor, the cursor is closed or Cursor.flush_profile is called.
+'''
+
+import re
+import threading
+
+import psycopg2.extensions
+
+################################################################################
+# normalize_query (function) ###################################################
+################################################################################
+
+_literal = re.compile(r"'(?:[^']|'')*'")
+_number = re.compile(r'(?<![\w$.])-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?\b')
+_value_list = re.compile(r'\?(?:\s*,\s*\?)+')
+_whitespace = re.compile(r'\s+')
+_writes = re.compile(r'\b(?:CREATE|MERGE|SET|DELETE|REMOVE|nextval|setval)\b', re.IGNORECASE)
+
+def normalize_query(query):
+    '''
+    The shape of a query: string and numeric literals are replaced by ?,
+    lists of them by ?, ... and whitespace is collapsed, e.g.
+
+    "MATCH (v:gene {'symbol': 'TP53'}) WHERE v.score > 0.5 RETURN v;"
+    --> "MATCH (v:gene {?: ?}) WHERE v.score > ? RETURN v;"
+    '''
+    if isinstance(query, bytes):
+        query = query.decode('utf-8', 'replace')
+    template = _literal.sub('?', query)
+    template = _number.sub('?', template)
+    template = _value_list.sub('?, ...', template)
+    return _whitespace.sub(' ', template).strip()
+
+################################################################################
+# QueryEvent (class) ###########################################################
+################################################################################
+
+class QueryEvent:
+    '''
+    Measurements of one executed query.
+
+    Attributes:
+
+        query (str): the query as sent to the server
+        template (str): the shape of the query, see normalize_query
+        started (float): start of the execution as time.time()
+        seconds (float): wall time of the execution
+        rows (int): number of rows returned or affected (-1 if unknown)
+        bytes_decoded (int): size of the vertices and edges decoded from
+                             the result
+        cast_seconds (float): time spent decoding vertices and edges
+        plan (str): EXPLAIN (ANALYZE, BUFFERS) output for slow queries,
+                    see Profiler(explain_threshold=...)
+    '''
+
+    __slots__ = ('query', 'template', 'started', 'seconds', 'rows',
+                 'bytes_decoded', 'cast_seconds', 'plan')
+
+    def __init__(self, query, template, started, seconds, rows):
+        self.query = query
+        self.template = template
+        self.started = started
+        self.seconds = seconds
+        self.rows = rows
+        self.bytes_decoded = 0
+        self.cast_seconds = 0.0
+        self.plan = None
+
+    def __repr__(self):
+        return 'QueryEvent({!r}, seconds={:.6f}, rows={}, bytes_decoded={}, cast_seconds={:.6f})'\
+               .format(self.template, self.seconds, self.rows, self.bytes_decoded, self.cast_seconds)
+
+################################################################################
+# QueryStats (class) ###########################################################
+################################################################################
+
+class QueryShapeStats:
+    '''
+    Aggregated measurements of all queries of one shape.
+    '''
+
+    __slots__ = ('calls', 'seconds', 'max_seconds', 'rows',
+                 'bytes_decoded', 'cast_seconds', 'plan')
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.rows = 0
+        self.bytes_decoded = 0
+        self.cast_seconds = 0.0
+        self.plan = None
+
+    @property
+    def mean_seconds(self):
+        return self.seconds / self.calls if self.calls else 0.0
+
+    def __repr__(self):
+        return 'QueryShapeStats(calls={}, seconds={:.6f}, max_seconds={:.6f}, rows={}, '\
+               'bytes_decoded={}, cast_seconds={:.6f})'\
+               .format(self.calls, self.seconds, self.max_seconds, self.rows,
+                       self.bytes_decoded, self.cast_seconds)
+
+
+class QueryStats:
+    '''
+    Per query shape aggregation of QueryEvents, usable as Profiler callback.
+    '''
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._shapes = {}
+
+    def __call__(self, event):
+        with self._lock:
+            stats = self._shapes.get(event.template)
+            if stats is None:
+                stats = self._shapes[event.template] = QueryShapeStats()
+            stats.calls += 1
+            stats.seconds += event.seconds
+            stats.max_seconds = max(stats.max_seconds, event.seconds)
+            stats.rows += max(event.rows, 0)
+            stats.bytes_decoded += event.bytes_decoded
+            stats.cast_seconds += event.cast_seconds
+            if event.plan is not None:
+                stats.plan = event.plan
+
+    def __getitem__(self, template):
+        return self._shapes[template]
+
+    def __len__(self):
+        return len(self._shapes)
+
+    def items(self):
+        with self._lock:
+            return list(self._shapes.items())
+
+    def top(self, n=10, key='seconds'):
+        '''
+        The n query shapes with the largest key ('seconds', 'calls',
+        'max_seconds', 'rows', 'bytes_decoded', 'cast_seconds', ...).
+
+        Returns:
+
+            list: (template, QueryShapeStats) tuples
+        '''
+        return sorted(self.items(), key=lambda item: getattr(item[1], key), reverse=True)[:n]
+
+    def reset(self):
+        with self._lock:
+            self._shapes = {}
+
+################################################################################
+# Profiler (class) #############################################################
+################################################################################
+
+class Profiler:
+
+    def __init__(self, callbacks=(), stats=True, explain_threshold=None):
+        '''
+        Args:
+
+            callbacks (list): functions called with each QueryEvent
+            stats (bool): aggregate the events per query shape in
+                          Profiler.stats (a QueryStats instance)
+            explain_threshold (float): if given, read-only queries (SELECT,
+                                       MATCH) running at least that many
+                                       seconds are run again with
+                                       EXPLAIN (ANALYZE, BUFFERS) in a
+                                       savepoint that is rolled back (plain
+                                       EXPLAIN in autocommit mode) and the
+                                       plan is stored in QueryEvent.plan
+        '''
+        self._callbacks = list(callbacks)
+        self.stats = QueryStats() if stats else None
+        self.explain_threshold = explain_threshold
+
+    def add_callback(self, callback):
+        self._callbacks.append(callback)
+        return self
+
+    def remove_callback(self, callback):
+        self._callbacks.remove(callback)
+        return self
+
+    def _start(self, cursor, query, template, started, seconds):
+        event = QueryEvent(query, template, started, seconds, cursor.rowcount)
+        if self.explain_threshold is not None and seconds >= self.explain_threshold:
+            event.plan = self._explain(cursor, query)
+        return event
+
+    def _finish(self, event):
+        if self.stats is not None:
+            self.stats(event)
+        for callback in self._callbacks:
+            callback(event)
+
+    @classmethod
+    def _explain(cls, cursor, query):
+        '''
+        EXPLAIN (ANALYZE, BUFFERS) query inside a savepoint which is always
+        rolled back, such that neither the effects of the query nor failures
+        persist. Queries which may write (Cypher clauses CREATE, MERGE, SET,
+        DELETE or REMOVE, sequence functions which are not transactional)
+        are not explained. On connections in autocommit
+        mode there is no transaction to roll back, so only a plain EXPLAIN
+        is run.
+        '''
+        if isinstance(query, bytes):
+            query = query.decode(psycopg2.extensions.encodings.get(cursor.connection.encoding, 'utf-8'),
+                                 'replace')
+        statement = query.strip().rstrip(';')
+        if statement.split(None, 1)[0].upper() not in ('SELECT', 'MATCH'):
+            return None
+        if _writes.search(_literal.sub("''", statement)):
+            return None
+        connection = cursor.connection
+        savepoint = not connection.autocommit
+        explain = connection.cursor()
+        try:
+            if savepoint:
+                explain.execute('SAVEPOINT agenspy_explain;')
+            try:
+                explain.execute('EXPLAIN {}{};'.format('(ANALYZE, BUFFERS) ' if savepoint else '', statement))
+                return '\n'.join(row[0] for row in explain.fetchall())
+            except Exception:
+                return None
+            finally:
+                if savepoint:
+                    # undo whatever the analyzed run did, also on success
+                    explain.execute('ROLLBACK TO SAVEPOINT agenspy_explain;')
+                    explain.execute('RELEASE SAVEPOINT agenspy_explain;')
+        finally:
+            explain.close()
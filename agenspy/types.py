@@ -1,20 +1,245 @@
+import inspect
+import json
+
+try:
+    # optional, considerably faster JSON decoding
+    import orjson as _json
+except ImportError:
+    _json = json
+
+_json_loads = _json.loads
+
+################################################################################
+# GraphId (class) ##############################################################
+################################################################################
+
+# AgensGraph stores a graphid as 64-bit integer: 16 bits label id, 48 bits
+# local id. Its text representation is 'labid.locid'.
+
+_LOCID_BITS = 48
+_LOCID_MASK = (1 << _LOCID_BITS) - 1
+
+class GraphId(int):
+    '''
+    A graphid, decoded once into its packed 64-bit integer value.
+
+    Behaves like an int (hashing, comparison, arrays), but is printed and
+    sent to the server in the 'labid.locid' text representation. It also
+    compares equal to that text (GraphId.parse('3.17') == '3.17'), but
+    hashes like the int, so dict and set lookups need a GraphId (or int).
+    '''
+    __slots__ = ()
+
+    def __eq__(self, other):
+        if isinstance(other, str):
+            try:
+                return int(self) == int(GraphId.parse(other))
+            except ValueError:
+                return False
+        return int.__eq__(self, other)
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    __hash__ = int.__hash__
+
+    @classmethod
+    def parse(cls, text):
+        '''
+        '3.17' --> GraphId((3 << 48) | 17)
+        '''
+        oid, _, index = text.partition('.')
+        return cls((int(oid) << _LOCID_BITS) | int(index))
+
+    @classmethod
+    def of(cls, ID):
+        '''
+        GraphId, packed int or text representation --> GraphId
+        '''
+        if isinstance(ID, cls):
+            return ID
+        if isinstance(ID, int):
+            return cls(ID)
+        return cls.parse(str(ID))
+
+    @property
+    def oid(self):
+        return int(self) >> _LOCID_BITS
+
+    @property
+    def index(self):
+        return int(self) & _LOCID_MASK
+
+    def __str__(self):
+        return '{}.{}'.format(int(self) >> _LOCID_BITS, int(self) & _LOCID_MASK)
+
+    def __format__(self, format_spec):
+        return format(str(self), format_spec)
+
+    def __repr__(self):
+        return 'GraphId({!r})'.format(str(self))
+
+
+def _pack_graphid(ID):
+    '''
+    '3.17' --> (3 << 48) | 17
+    '''
+    return int(GraphId.of(ID))
+
+def _unpack_graphid(packed):
+    '''
+    (3 << 48) | 17 --> GraphId('3.17')
+    '''
+    return GraphId(packed)
+
+def _fetch_properties(graph, entities, keys=None):
+    '''
+    graph.fetch_properties(entities, keys), which has to be awaited
+    explicitly for entities of an agenspy.aio.AsyncGraph.
+    '''
+    if inspect.iscoroutinefunction(graph.fetch_properties):
+        raise TypeError('properties of entities of an AsyncGraph are not fetched implicitly, '
+                        'use await graph.fetch_properties(...) first')
+    graph.fetch_properties(entities, keys)
+
 ################################################################################
 # GraphEntity (class) ##########################################################
 ################################################################################
 
 class GraphEntity(dict):
-    def __init__(self, ID, graph, label=None, properties=None):
+    def __init__(self, ID, graph, label=None, properties=None, raw_properties=None):
         '''
         A client should never instantiate a GraphEntity herself!
+
+        If raw_properties (the JSON text of the properties) is given, it is
+        only decoded on first access of the properties.
         '''
         super().__init__({} if properties is None else properties)
-        self._id = ID
+        self._id = None if ID is None else GraphId.of(ID)
         self._graph = graph
         self._label = label
+        self._raw_properties = raw_properties
+        self._absent_keys = None
 
     def __hash__(self):
         return hash(self._id)
 
+    def _cache_properties(self, properties, keys=None):
+        '''
+        Store fetched properties in the cache. Requested keys which the
+        entity does not have are remembered, so that get() does not ask
+        the server again.
+        '''
+        self._decode()
+        dict.update(self, properties)
+        if keys is not None:
+            absent = set(keys) - set(properties)
+            if absent:
+                self._absent_keys = absent if self._absent_keys is None else self._absent_keys | absent
+
+    def _get(self, key):
+        if key in self:
+            return self[key]
+        if self._absent_keys is not None and key in self._absent_keys:
+            return None
+        # --- if not cached
+        _fetch_properties(self.graph, [self], [key])
+        return dict.get(self, key)
+
+    # ----- lazy property decoding -------------------------------------------
+
+    def _decode(self):
+        if self._raw_properties is not None:
+            dict.update(self, _json_loads(self._raw_properties))
+            self._raw_properties = None
+
+    @property
+    def decoded(self):
+        return self._raw_properties is None
+
+    def __getitem__(self, key):
+        self._decode()
+        return dict.__getitem__(self, key)
+
+    def __contains__(self, key):
+        self._decode()
+        return dict.__contains__(self, key)
+
+    def __iter__(self):
+        self._decode()
+        return dict.__iter__(self)
+
+    def __len__(self):
+        self._decode()
+        return dict.__len__(self)
+
+    def __eq__(self, other):
+        self._decode()
+        if isinstance(other, GraphEntity):
+            other._decode()
+        return dict.__eq__(self, other)
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    def __setitem__(self, key, value):
+        self._decode()
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        self._decode()
+        dict.__delitem__(self, key)
+
+    def __reversed__(self):
+        self._decode()
+        return reversed(dict.keys(self))
+
+    def __repr__(self):
+        self._decode()
+        return dict.__repr__(self)
+
+    def keys(self):
+        self._decode()
+        return dict.keys(self)
+
+    def values(self):
+        self._decode()
+        return dict.values(self)
+
+    def items(self):
+        self._decode()
+        return dict.items(self)
+
+    def get(self, key, default=None):
+        self._decode()
+        return dict.get(self, key, default)
+
+    def copy(self):
+        self._decode()
+        return dict.copy(self)
+
+    def update(self, *args, **kwargs):
+        self._decode()
+        dict.update(self, *args, **kwargs)
+
+    def setdefault(self, key, default=None):
+        self._decode()
+        return dict.setdefault(self, key, default)
+
+    def pop(self, key, *default):
+        self._decode()
+        return dict.pop(self, key, *default)
+
+    def popitem(self):
+        self._decode()
+        return dict.popitem(self)
+
+    def clear(self):
+        self._raw_properties = None
+        dict.clear(self)
+
     def _match(self, x):
         return 'id({}) = (SELECT CAST(\'{}\' as graphid))'.format(x, self._id)
 
@@ -28,21 +253,31 @@ class GraphEntity(dict):
 
     @property
     def id(self):
+        '''
+        The graphid as GraphId. It used to be the str 'labid.locid',
+        which the GraphId still compares equal to.
+        '''
         return self._id
 
     @property
     def oid(self):
-        return self._id.split('.')[0]
+        '''
+        The label id of the graphid, an int (it used to be a str).
+        '''
+        return self._id.oid
 
     @property
     def index(self):
-        return self._id.split('.')[1]
+        '''
+        The local id of the graphid, an int (it used to be a str).
+        '''
+        return self._id.index
 
     @property
     def label(self):
         return self.get_label()
 
-    def get_label(self, cache=False):
+    def get_label(self, cache=True):
         raise NotImplementedError
 
     def properties(self, from_cache=True):
@@ -64,31 +299,94 @@ class GraphVertex(GraphEntity):
         return 'MATCH (v) WHERE '+self._match('v')
 
     def get(self, item):
-        if item in self:
-            return self[item]
-        # --- if not cached
-        cmd = [self._match_node_asv]
-        cmd.append('RETURN v->>\''+item+'\';')
-        return self.graph.execute(' '.join(cmd)).fetchone()[0]
+        return self._get(item)
 
-    def get_label(self, cache=False):
+    def get_label(self, cache=True):
         if self._label is None:
-            cmd = [self._match_node_asv]
-            cmd.append('RETURN label(v);')
-            label = self.graph.execute(' '.join(cmd)).fetchone()[0]
+            label = self.graph.label_of(self._id)
             if cache:
                 self._label = label
             return label
         return self._label
 
     def _properties(self):
-        pass # TODO
+        _fetch_properties(self.graph, [self])
+        return dict(self)
+
+    def neighbors(self,
+                  depth=1,
+                  incoming=True,
+                  outgoing=True,
+                  edge_labels=None,
+                  vertex_labels=None,
+                  max_nodes=None,
+                  properties=True):
+        '''
+        The vertices within depth hops of this vertex (itself excluded),
+        ordered by distance. The traversal is level-synchronous on the
+        server, one query per hop for the whole frontier.
+
+        Args:
+
+            depth (int): number of hops
+            incoming (bool): follow incoming edges
+            outgoing (bool): follow outgoing edges
+            edge_labels: edge label(s) to follow, all if None
+            vertex_labels: vertex label(s) to visit, all if None
+            max_nodes (int): raise a ValueError if the neighborhood
+                             exceeds max_nodes vertices
+            properties (bool): fetch the properties of the neighbors
+
+        Returns:
+
+            VertexList
+        '''
+        distances, _, _ = self.graph._traverse([self],
+                                               depth,
+                                               incoming,
+                                               outgoing,
+                                               edge_labels,
+                                               vertex_labels,
+                                               max_nodes)
+        ids = [ID for ID in distances if ID != self._id]
+        if not properties:
+            return VertexList(GraphVertex(ID, self.graph) for ID in ids)
+        id2vertex = {vertex.id: vertex for vertex in self.graph._match_vertices(ids)}
+        return VertexList(id2vertex[ID] for ID in ids)
+
+    def neighborhood_graph(self,
+                           depth=1,
+                           incoming=True,
+                           outgoing=True,
+                           edge_labels=None,
+                           vertex_labels=None,
+                           max_nodes=None,
+                           induced=True):
+        '''
+        The subgraph of the vertices within depth hops of this vertex (itself
+        included) and the edges among them, see GraphVertex.neighbors.
 
-    def neighbors(self, depth=1, incoming=True, outgoing=True):
-        pass
+        Args:
 
-    def neighborhood_graph(self, depth=1, incoming=True, outgoing=True):
-        pass
+            induced (bool): include the edges among the vertices of the last
+                            hop (one more query), otherwise only the edges
+                            traversed on the way
+
+        Returns:
+
+            agenspy.graph.Subgraph
+        '''
+        distances, edges, _ = self.graph._traverse([self],
+                                                   depth,
+                                                   incoming,
+                                                   outgoing,
+                                                   edge_labels,
+                                                   vertex_labels,
+                                                   max_nodes,
+                                                   edges=True,
+                                                   edge_properties=True,
+                                                   induced=induced)
+        return self.graph._traversal_subgraph(distances, edges)
 
 ################################################################################
 # GraphEdge (class) ############################################################
@@ -96,20 +394,18 @@ class GraphVertex(GraphEntity):
 
 class GraphEdge(GraphEntity):
 
-    def __init__(self, ID, graph, sid, tid, label=None, properties=None):
-        super().__init__(ID, graph, label, properties)
-        self._sid = sid
-        self._tid = tid
+    def __init__(self, ID, graph, sid, tid, label=None, properties=None, raw_properties=None):
+        super().__init__(ID, graph, label, properties, raw_properties)
+        self._sid = None if sid is None else GraphId.of(sid)
+        self._tid = None if tid is None else GraphId.of(tid)
 
     @property
     def _match_edge_ase(self):
         return 'MATCH ()-[e]->() WHERE '+self._match('e')
 
-    def get_label(self, cache=False):
+    def get_label(self, cache=True):
         if self._label is None:
-            cmd = [self._match_edge_ase]
-            cmd.append('RETURN label(e);')
-            label = self.graph.execute(' '.join(cmd)).fetchone()[0]
+            label = self.graph.label_of(self._id)
             if cache:
                 self._label = label
             return label
@@ -118,19 +414,14 @@ class GraphEdge(GraphEntity):
     def get_properties(self, cache=False):
         if cache:
             return dict(self)
-        cmd = [self._match_edge_ase]
-        cmd.append('RETURN properties(e);')
-        return self.graph.execute(' '.join(cmd)).fetchone()[0]
+        _fetch_properties(self.graph, [self])
+        return dict(self)
 
     def get(self, attr):
-        if attr in self:
-            return self[attr]
-        # --- if not cached
-        cmd = [self._match_edge_ase]
-        #cmd.append('RETURN e->>\''+attr+'\';')
-        cmd.append('RETURN properties(e);')
-        #return self.graph.execute(' '.join(cmd)).fetchone()[0]
-        return self.graph.execute(' '.join(cmd)).fetchone()[0].get(attr)
+        return self._get(attr)
+
+    def _properties(self):
+        return self.get_properties()
 
     @property
     def sid(self):
@@ -152,7 +443,13 @@ class GraphEdge(GraphEntity):
 
 
 class VertexList(list):
-    pass
+
+    @property
+    def ids(self):
+        return [vertex.id for vertex in self]
 
 class EdgeList(list):
-    pass
+
+    @property
+    def ids(self):
+        return [edge.id for edge in self]
@@ -15,8 +15,12 @@ if __name__ == '__main__':
     kegg.create_from_igraph(graph,
                             node_label='gene',
                             edge_label_attr='interaction',
-                            strip_attrs=True)
+                            strip_attrs=True,
+                            bulk=True,
+                            workers=4,
+                            progress=print)
     print('--- time: %s seconds ---' %(time.time()-start))
+    print(kegg.bulk_load_report)
     print(kegg.nv)
     print(kegg.ne)
     kegg.commit()
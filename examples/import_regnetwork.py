@@ -17,8 +17,10 @@ if __name__ == '__main__':
     regnetwork.create_from_igraph(graph,
                                   node_label_attr='node_type',
                                   edge_label_attr='edge_type',
-                                  strip_attrs=True)
+                                  strip_attrs=True,
+                                  bulk=True)
     print('--- time: %s seconds ---' %(time.time()-start))
+    print(regnetwork.bulk_load_report)
     print(regnetwork.nv)
     print(regnetwork.ne)
     regnetwork.commit()
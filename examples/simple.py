@@ -49,7 +49,7 @@ if __name__ == '__main__':
     print(G.fetchall())
 
  #   print('\nCursor history:\n')
- #   print('\n'.join(G.history))
+ #   print('\n'.join(str(record) for record in G.history))
 
     g = G.to_igraph(node_label='ag_node_label',
                     edge_property_prefix='ag',
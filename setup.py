@@ -12,7 +12,7 @@ setup(name='agenspy',
       platform='any',
       python_requires='>=3.5',
       install_requires=[
-          'psycopg2>=2.7'
+          'psycopg2>=2.8'
       ],
       classifiers=[
           'Development Status :: 3 - Alpha',
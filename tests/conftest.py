@@ -0,0 +1,32 @@
+import os
+
+import pytest
+
+################################################################################
+# database fixtures ############################################################
+################################################################################
+
+@pytest.fixture
+def graph():
+    '''
+    A fresh Graph 'agenspy_test' on the AgensGraph server configured via
+    AGENSPY_TEST_DSN (libpq connection string), skipped if unavailable.
+    '''
+    dsn = os.environ.get('AGENSPY_TEST_DSN')
+    if not dsn:
+        pytest.skip('AGENSPY_TEST_DSN is not set')
+    psycopg2 = pytest.importorskip('psycopg2')
+    import agenspy.graph
+    try:
+        connection = psycopg2.connect(dsn)
+    except psycopg2.Error as error:
+        pytest.skip('AgensGraph not available: {}'.format(error))
+    graph = agenspy.graph.Graph('agenspy_test',
+                                authorization=connection.info.user,
+                                connection=connection,
+                                replace=True)
+    yield graph
+    graph.rollback()
+    graph.drop_graph('agenspy_test', if_exists=True)
+    graph.commit()
+    graph.close()
@@ -0,0 +1,57 @@
+import asyncio
+
+import psycopg2.extensions
+import pytest
+
+import agenspy.aio
+import agenspy.types
+from agenspy.aio import AsyncGraph
+
+################################################################################
+# helpers ######################################################################
+################################################################################
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+class ReadyConnection:
+
+    def poll(self):
+        return psycopg2.extensions.POLL_OK
+
+def test_wait_on_ready_connection():
+    assert run(agenspy.aio._wait(ReadyConnection())) is None
+
+################################################################################
+# AsyncGraph without connect ###################################################
+################################################################################
+
+class FakeAsyncGraph(AsyncGraph):
+
+    async def _getconn(self):
+        return 'connection'
+
+    def _putconn(self, connection, discard=False):
+        self._idle.append(connection)
+
+def test_acquire_creates_semaphore_lazily():
+    graph = FakeAsyncGraph('g', maxconn=2)
+
+    async def acquire():
+        async with graph._acquire() as connection:
+            return connection
+
+    assert run(acquire()) == 'connection'
+    assert graph._idle == ['connection']
+
+def test_unconnected_graph_raises():
+    graph = AsyncGraph('g')
+    with pytest.raises(RuntimeError):
+        graph.graphid
+    with pytest.raises(RuntimeError):
+        run(graph.fetch_properties([agenspy.types.GraphVertex('3.1', graph, 'gene', {})]))
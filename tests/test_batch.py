@@ -0,0 +1,76 @@
+import pytest
+
+import agenspy.types
+from agenspy.graph import GraphBatch
+
+################################################################################
+# fake graph ###################################################################
+################################################################################
+
+class FakeGraph:
+
+    def __init__(self, fail_edges=False):
+        self.fail_edges = fail_edges
+        self.commits = 0
+        self._next = 0
+        self._batch = None
+
+    def _ids(self, n, oid):
+        self._next += n
+        return [agenspy.types.GraphId((oid << 48) | index) for index in range(self._next-n+1, self._next+1)]
+
+    def create_nodes(self, n, labels, properties, page_size):
+        return [agenspy.types.GraphVertex(ID, self, label, props)
+                for ID, label, props in zip(self._ids(n, 3), labels, properties)]
+
+    def create_edges(self, pairs, labels, properties, page_size):
+        if self.fail_edges:
+            raise RuntimeError('edge insert failed')
+        return [agenspy.types.GraphEdge(ID, self, source.id, target.id, label, props)
+                for ID, (source, target), label, props
+                in zip(self._ids(len(pairs), 4), pairs, labels, properties)]
+
+    def commit(self):
+        self.commits += 1
+
+################################################################################
+# GraphBatch ###################################################################
+################################################################################
+
+def test_flush_resolves_placeholders():
+    graph = FakeGraph()
+    batch = GraphBatch(graph, size=100)
+    a = batch.create_node('gene', symbol='A')
+    b = batch.create_node('gene', symbol='B')
+    e = batch.create_edge(a, 'rel', b)
+    assert a.id is None and e.id is None
+    batch.flush()
+    assert a.id is not None and b.id is not None
+    assert (e.sid, e.tid) == (a.id, b.id)
+    assert (batch.nodes_flushed, batch.edges_flushed, graph.commits) == (2, 1, 1)
+    assert len(batch) == 0
+
+def test_flush_rejects_foreign_placeholder_and_keeps_queue():
+    graph = FakeGraph()
+    batch = GraphBatch(graph, size=100)
+    a = batch.create_node('gene')
+    stray = agenspy.types.GraphVertex(None, graph, 'gene', {})
+    batch.create_edge(a, 'rel', stray)
+    with pytest.raises(ValueError):
+        batch.flush()
+    assert len(batch) == 2
+    assert a.id is None
+
+def test_failed_flush_requeues():
+    graph = FakeGraph(fail_edges=True)
+    batch = GraphBatch(graph, size=100)
+    a = batch.create_node('gene')
+    e = batch.create_self_loop(a, 'rel')
+    with pytest.raises(RuntimeError):
+        batch.flush()
+    assert len(batch) == 2
+    assert a.id is None and e.id is None
+    graph.fail_edges = False
+    batch.flush()
+    assert e.sid == a.id
+    assert (batch.nodes_flushed, batch.edges_flushed) == (1, 1)
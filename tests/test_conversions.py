@@ -0,0 +1,87 @@
+import pytest
+
+from agenspy.graph import ColumnarSubgraph, Subgraph, _networkit_graph
+from agenspy.types import GraphEdge, GraphId, GraphVertex
+
+################################################################################
+# fixtures #####################################################################
+################################################################################
+
+def subgraph():
+    a = GraphVertex('3.1', None, 'gene', {'symbol': 'A'})
+    b = GraphVertex('3.2', None, 'gene', {'symbol': 'B', 'score': 2})
+    e = GraphEdge('4.1', None, '3.1', '3.2', 'rel', {'w': 1.5})
+    f = GraphEdge('4.2', None, '3.2', '3.1', 'rel', {'w': None})
+    return Subgraph([a, b], [e, f], normalized=True)
+
+def columnar_subgraph():
+    return ColumnarSubgraph._from_rows(None,
+                                       [('4.1', '3.1', '3.2', 'rel', {'w': 1.5}),
+                                        ('4.2', '3.2', '3.1', 'rel', {})],
+                                       [('3.1', 'gene', {'symbol': 'A'}),
+                                        ('3.2', 'gene', {'symbol': 'B', 'score': 2})])
+
+################################################################################
+# to_networkx ##################################################################
+################################################################################
+
+@pytest.mark.parametrize('make', [subgraph, columnar_subgraph])
+def test_to_networkx(make):
+    pytest.importorskip('networkx')
+    G = make().to_networkx()
+    a, b = GraphId.parse('3.1'), GraphId.parse('3.2')
+    assert G.is_directed() and G.is_multigraph()
+    assert G.nodes[a] == {'label': 'gene', 'properties': {'symbol': 'A'}}
+    assert G.edges[a, b, GraphId.parse('4.1')] == {'label': 'rel', 'properties': {'w': 1.5}}
+    assert G.number_of_edges() == 2
+
+@pytest.mark.parametrize('make', [subgraph, columnar_subgraph])
+def test_to_networkx_expanded(make):
+    pytest.importorskip('networkx')
+    G = make().to_networkx(expand_node_properties=True, node_property_prefix='p', directed=False)
+    assert not G.is_directed()
+    assert G.nodes[GraphId.parse('3.2')] == {'label': 'gene', 'p_symbol': 'B', 'p_score': 2}
+    assert G.nodes[GraphId.parse('3.1')] == {'label': 'gene', 'p_symbol': 'A'}
+
+def test_to_networkx_shared_properties():
+    pytest.importorskip('networkx')
+    sg = subgraph()
+    G = sg.to_networkx(copy_properties=False)
+    node = sg.nodes[0]
+    assert G.nodes[node.id]['properties'] is node
+    G = sg.to_networkx()
+    assert G.nodes[node.id]['properties'] is not node
+
+################################################################################
+# to_networkit #################################################################
+################################################################################
+
+def test_networkit_graph():
+    pytest.importorskip('networkit')
+    G = _networkit_graph(3, [0, 1], [1, 2], [2.0, 3.0], directed=True)
+    assert (G.numberOfNodes(), G.numberOfEdges()) == (3, 2)
+    assert G.isWeighted() and G.weight(1, 2) == 3.0
+    G = _networkit_graph(4, [], [], directed=False)
+    assert (G.numberOfNodes(), G.numberOfEdges(), G.isWeighted()) == (4, 0, False)
+
+@pytest.mark.parametrize('make', [subgraph, columnar_subgraph])
+def test_to_networkit(make):
+    pytest.importorskip('networkit')
+    sg = make()
+    G = sg.to_networkit()
+    assert not G.isWeighted() and G.numberOfEdges() == 2
+    G = sg.to_networkit(edge_weight_attr='w', default_weight=4.0)
+    index = {node.id: i for i, node in enumerate(sg.nodes)}
+    a, b = index[GraphId.parse('3.1')], index[GraphId.parse('3.2')]
+    assert G.weight(a, b) == 1.5
+    assert G.weight(b, a) == 4.0
+
+################################################################################
+# ColumnarSubgraph #############################################################
+################################################################################
+
+def test_columnar_subgraph_missing_endpoint():
+    with pytest.raises(ValueError, match=r'3\.9'):
+        ColumnarSubgraph._from_rows(None,
+                                    [('4.1', '3.1', '3.9', 'rel', {})],
+                                    [('3.1', 'gene', {})])
@@ -0,0 +1,33 @@
+'''
+Tests against an AgensGraph server, skipped unless AGENSPY_TEST_DSN is set,
+see conftest.py.
+'''
+
+def test_create_and_count(graph):
+    a = graph.create_node('gene', symbol='A')
+    b = graph.create_node('gene', symbol='B')
+    e = graph.create_edge(a, 'interacts', b, score=0.5)
+    assert graph.numv('gene') == 2
+    assert graph.numv('gene', {'symbol': 'A'}) == 1
+    assert graph.numv('unknown') == 0
+    assert e.sid == a.id and e.tid == b.id
+    assert graph.label_of(a.id) == 'gene'
+
+def test_label_created_by_raw_cypher(graph):
+    graph.execute('CREATE (:late {x: 1});')
+    assert graph.numv('late') == 1
+
+def test_induced_subgraphs(graph):
+    a, b, c = [graph.create_node('gene', symbol=symbol) for symbol in 'ABC']
+    ab = graph.create_edge(a, 'interacts', b)
+    graph.create_edge(b, 'interacts', c)
+    sg = graph.node_induced_subgraph([a, b])
+    assert {edge.id for edge in sg.edges} == {ab.id}
+    sg = graph.edge_induced_subgraph([ab])
+    assert {node.id for node in sg.nodes} == {a.id, b.id}
+
+def test_neighbors(graph):
+    a, b, c = [graph.create_node('gene', symbol=symbol) for symbol in 'ABC']
+    graph.create_edge(a, 'interacts', b)
+    graph.create_edge(b, 'interacts', c)
+    assert [node.id for node in a.neighbors(depth=2)] == [b.id, c.id]
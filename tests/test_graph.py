@@ -0,0 +1,39 @@
+import json
+
+import pytest
+
+from agenspy.graph import _cypher_literal, _properties_json
+
+################################################################################
+# _properties_json #############################################################
+################################################################################
+
+def test_properties_json_drops_missing_values():
+    assert json.loads(_properties_json({'a': 1, 'b': None, 'c': float('nan'), 'd': 'x'})) == {'a': 1, 'd': 'x'}
+
+def test_properties_json_numpy_values():
+    np = pytest.importorskip('numpy')
+    properties = {'i': np.int64(3), 'b': np.bool_(True), 'f': np.float32(1.5),
+                  'a': np.arange(2), 'nan': np.float64('nan')}
+    assert json.loads(_properties_json(properties)) == {'i': 3, 'b': True, 'f': 1.5, 'a': [0, 1]}
+
+################################################################################
+# _cypher_literal ##############################################################
+################################################################################
+
+def test_cypher_literal_scalars():
+    assert _cypher_literal(None) == 'null'
+    assert _cypher_literal(True) == 'true'
+    assert _cypher_literal(2.5) == '2.5'
+    assert _cypher_literal(10**400) == str(10**400)
+    assert _cypher_literal("O'Neil") == "'O''Neil'"
+
+def test_cypher_literal_rejects_non_finite_numbers():
+    for value in (float('nan'), float('inf'), -float('inf')):
+        with pytest.raises(ValueError):
+            _cypher_literal(value)
+    with pytest.raises(ValueError):
+        _cypher_literal({'x': float('nan')})
+
+def test_cypher_literal_nested():
+    assert _cypher_literal({'name': "O'Neil", 'tags': ['a', 1]}) == "{'name': 'O''Neil', 'tags': ['a', 1]}"
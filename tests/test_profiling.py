@@ -0,0 +1,87 @@
+from agenspy.profiling import Profiler, QueryEvent, QueryStats, normalize_query
+
+################################################################################
+# normalize_query ##############################################################
+################################################################################
+
+def test_normalize_query_literals():
+    query = "MATCH (v:gene {'symbol': 'TP53'}) WHERE v.score > 0.5 RETURN v;"
+    assert normalize_query(query) == 'MATCH (v:gene {?: ?}) WHERE v.score > ? RETURN v;'
+
+def test_normalize_query_lists_and_whitespace():
+    query = "SELECT *\n  FROM t WHERE id IN (1, 2,  3) AND name = 'O''Neil';"
+    assert normalize_query(query) == 'SELECT * FROM t WHERE id IN (?, ...) AND name = ?;'
+    assert normalize_query(b'SELECT 1;') == 'SELECT ?;'
+
+def test_normalize_query_keeps_identifiers():
+    assert normalize_query('SELECT t1.x2 FROM $1;') == 'SELECT t1.x2 FROM $1;'
+
+################################################################################
+# QueryStats ###################################################################
+################################################################################
+
+def test_query_stats():
+    stats = QueryStats()
+    for seconds in (1.0, 3.0):
+        stats(QueryEvent('q', 'a', 0.0, seconds, 10))
+    stats(QueryEvent('q', 'b', 0.0, 0.5, -1))
+    assert stats['a'].calls == 2 and stats['a'].max_seconds == 3.0
+    assert stats['a'].mean_seconds == 2.0 and stats['a'].rows == 20
+    assert stats['b'].rows == 0
+    assert [template for template, _ in stats.top(2)] == ['a', 'b']
+    stats.reset()
+    assert len(stats) == 0
+
+################################################################################
+# Profiler._explain ############################################################
+################################################################################
+
+class FakeConnection:
+
+    encoding = 'UTF8'
+
+    def __init__(self, autocommit):
+        self.autocommit = autocommit
+        self.statements = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+
+class FakeCursor:
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def execute(self, statement):
+        self.connection.statements.append(statement)
+
+    def fetchall(self):
+        return [('Seq Scan',)]
+
+    def close(self):
+        pass
+
+def test_explain_rolls_back_the_analyzed_run():
+    connection = FakeConnection(autocommit=False)
+    assert Profiler._explain(FakeCursor(connection), 'MATCH (v) RETURN v;') == 'Seq Scan'
+    assert connection.statements == ['SAVEPOINT agenspy_explain;',
+                                     'EXPLAIN (ANALYZE, BUFFERS) MATCH (v) RETURN v;',
+                                     'ROLLBACK TO SAVEPOINT agenspy_explain;',
+                                     'RELEASE SAVEPOINT agenspy_explain;']
+
+def test_explain_without_analyze_in_autocommit():
+    connection = FakeConnection(autocommit=True)
+    Profiler._explain(FakeCursor(connection), 'SELECT 1;')
+    assert connection.statements == ['EXPLAIN SELECT 1;']
+
+def test_explain_skips_writes():
+    connection = FakeConnection(autocommit=False)
+    for query in ('MATCH (v) SET v.x = 1;',
+                  'MATCH (v) DETACH DELETE v;',
+                  "SELECT nextval('s');",
+                  'INSERT INTO t VALUES (1);'):
+        assert Profiler._explain(FakeCursor(connection), query) is None
+    assert connection.statements == []
+    Profiler._explain(FakeCursor(connection), "MATCH (v {name: 'create'}) RETURN v;")
+    assert len(connection.statements) == 4
@@ -0,0 +1,139 @@
+import json
+
+import pytest
+
+from agenspy.graph import Graph
+from agenspy.types import GraphId
+
+################################################################################
+# in-memory graph ##############################################################
+################################################################################
+
+def vid(index):
+    return GraphId.parse('3.{}'.format(index))
+
+def eid(index):
+    return GraphId.parse('4.{}'.format(index))
+
+
+class MemoryGraph(Graph):
+    '''
+    Graph answering Graph._expand from an in-memory edge list.
+    '''
+
+    def __init__(self, edges):
+        self._catalog = {}
+        self.rows = [(eid(index), vid(start), vid(end)) for index, (start, end) in enumerate(edges, 1)]
+        self.expanded = []
+
+    def _expand(self, ids, incoming=True, outgoing=True, edge_relids=None, properties=False, chunk_size=10000):
+        self.expanded.append(sorted(ids))
+        frontier = set(ids)
+        for row in self.rows:
+            if (outgoing and row[1] in frontier) or (incoming and row[2] in frontier):
+                yield row
+
+# 6 -> 1 -> 2 -> 3 -> 4 and 5 -> 3
+PATH = [(1, 2), (2, 3), (3, 4), (5, 3), (6, 1)]
+
+################################################################################
+# Graph._traverse ##############################################################
+################################################################################
+
+def test_traverse_distances_outgoing():
+    graph = MemoryGraph(PATH)
+    distances, _, _ = graph._traverse([vid(1)], depth=2, incoming=False)
+    assert distances == {vid(1): 0, vid(2): 1, vid(3): 2}
+
+def test_traverse_both_directions():
+    graph = MemoryGraph(PATH)
+    distances, _, _ = graph._traverse([vid(3)], depth=1)
+    assert distances == {vid(3): 0, vid(2): 1, vid(4): 1, vid(5): 1}
+
+def test_traverse_expands_every_vertex_once():
+    graph = MemoryGraph(PATH)
+    graph._traverse([vid(1)], depth=10, incoming=False)
+    assert graph.expanded == [[vid(1)], [vid(2)], [vid(3)], [vid(4)]]
+
+def test_traverse_collects_edges_and_closes_last_hop():
+    graph = MemoryGraph([(1, 2), (1, 3), (2, 3)])
+    _, edges, _ = graph._traverse([vid(1)], depth=1, incoming=False, edges=True)
+    assert set(edges) == {eid(1), eid(2)}
+    _, edges, _ = graph._traverse([vid(1)], depth=1, incoming=False, edges=True, induced=True)
+    assert set(edges) == {eid(1), eid(2), eid(3)}
+
+def test_traverse_membership_bits():
+    graph = MemoryGraph(PATH)
+    distances, _, masks = graph._traverse([vid(1), vid(5)], depth=1, incoming=False, membership=True)
+    assert masks[vid(1)] == 0b01 and masks[vid(2)] == 0b01
+    assert masks[vid(5)] == 0b10 and masks[vid(3)] == 0b10
+    assert distances[vid(3)] == 1
+
+def test_traverse_reexpands_with_new_bits_only():
+    graph = MemoryGraph([(1, 3), (2, 1), (3, 4)])
+    # seed 1 reaches 3 at hop 1, seed 2 reaches 3 only at hop 2 via 1
+    distances, _, masks = graph._traverse([vid(1), vid(2)], depth=3, incoming=False, membership=True)
+    assert masks[vid(3)] == 0b11 and masks[vid(4)] == 0b11
+    assert distances[vid(3)] == 1 and distances[vid(4)] == 2
+
+def test_traverse_max_nodes():
+    graph = MemoryGraph(PATH)
+    with pytest.raises(ValueError):
+        graph._traverse([vid(1)], depth=3, incoming=False, max_nodes=2)
+
+################################################################################
+# Graph.neighborhoods ##########################################################
+################################################################################
+
+def test_neighborhoods():
+    graph = MemoryGraph(PATH)
+    hoods = graph.neighborhoods([vid(1), vid(5)], depth=1, incoming=False)
+    assert len(hoods) == 2
+    assert set(hoods.ids(vid(1))) == {vid(1), vid(2)}
+    assert set(hoods.ids('3.5')) == {vid(5), vid(3)}
+    assert list(hoods.sizes()) == [2, 2]
+    assert hoods.nv == 4
+
+def test_neighborhoods_unknown_seed():
+    hoods = MemoryGraph(PATH).neighborhoods([vid(1)], depth=1)
+    for seed in ('TP53', vid(4), '3.4', None):
+        with pytest.raises(KeyError):
+            hoods[seed]
+        with pytest.raises(KeyError):
+            hoods.ids(seed)
+
+################################################################################
+# seeds by property value ######################################################
+################################################################################
+
+class PropertyGraph(MemoryGraph):
+    '''
+    MemoryGraph whose vertices i have the property {'symbol': symbols[i]}.
+    '''
+
+    def __init__(self, edges, symbols):
+        super().__init__(edges)
+        self.symbols = symbols
+
+    def _has_xlabel(self, label, x):
+        return True
+
+    def _xlabel_table(self, label):
+        return 'g.' + label
+
+    def execute_prepared(self, query, args=(), types=()):
+        key, encoded = args
+        self._rows = [(n, vid(index)) for n, value in enumerate(encoded, 1)
+                      for index, symbol in self.symbols.items() if json.dumps(symbol) == value]
+
+    def fetchall(self):
+        return self._rows
+
+def test_neighborhoods_by_property_value():
+    graph = PropertyGraph(PATH, {1: 'TP53', 5: True, 6: 1e20})
+    hoods = graph.neighborhoods(['TP53', True, 1e20, 'none'], depth=1, incoming=False,
+                                seed_label='gene', seed_key='symbol')
+    assert set(hoods.ids('TP53')) == {vid(1), vid(2)}
+    assert set(hoods.ids(True)) == {vid(5), vid(3)}
+    assert set(hoods.ids(1e20)) == {vid(6), vid(1)}
+    assert hoods.ids('none') == []
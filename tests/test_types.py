@@ -0,0 +1,124 @@
+import pytest
+
+from agenspy.types import GraphId, GraphVertex, GraphEdge
+
+################################################################################
+# GraphId ######################################################################
+################################################################################
+
+def test_graphid_parse_and_format():
+    ID = GraphId.parse('3.17')
+    assert int(ID) == (3 << 48) | 17
+    assert (ID.oid, ID.index) == (3, 17)
+    assert str(ID) == '3.17'
+    assert '{:>6}'.format(ID) == '  3.17'
+
+def test_graphid_of():
+    ID = GraphId.parse('4.2')
+    assert GraphId.of(ID) is ID
+    assert GraphId.of('4.2') == ID
+    assert GraphId.of(int(ID)) == ID
+    assert hash(GraphId.of('4.2')) == hash(ID)
+
+################################################################################
+# lazy property decoding #######################################################
+################################################################################
+
+def lazy_vertex(raw='{"a": 1, "b": "x"}', ID='3.1'):
+    return GraphVertex(ID, None, 'gene', raw_properties=raw)
+
+def test_lazy_read():
+    v = lazy_vertex()
+    assert not v.decoded
+    assert v['a'] == 1
+    assert v.decoded
+    assert dict(lazy_vertex()) == {'a': 1, 'b': 'x'}
+    assert len(lazy_vertex()) == 2
+    assert 'b' in lazy_vertex()
+    assert list(reversed(lazy_vertex())) == ['b', 'a']
+
+def test_lazy_setitem_before_decoding():
+    v = lazy_vertex()
+    v['a'] = 5
+    assert v['a'] == 5
+    assert v['b'] == 'x'
+
+def test_lazy_mutators_before_decoding():
+    v = lazy_vertex()
+    v.update(c=3)
+    assert dict(v) == {'a': 1, 'b': 'x', 'c': 3}
+    v = lazy_vertex()
+    assert v.setdefault('a', 7) == 1
+    v = lazy_vertex()
+    assert v.pop('a') == 1 and 'a' not in v
+    v = lazy_vertex()
+    del v['b']
+    assert dict(v) == {'a': 1}
+    v = lazy_vertex('{"a": 1}')
+    assert v.popitem() == ('a', 1)
+    v = lazy_vertex()
+    v.clear()
+    assert dict(v) == {}
+
+def test_lazy_copy_and_comparison():
+    assert lazy_vertex().copy() == {'a': 1, 'b': 'x'}
+    v = lazy_vertex()
+    w = GraphVertex('3.1', None, 'gene', {'a': 1, 'b': 'x'})
+    assert v == w
+    assert not (lazy_vertex() != w)
+    assert lazy_vertex() != lazy_vertex('{"a": 2}')
+
+def test_entity_hash_is_graphid():
+    v = lazy_vertex()
+    assert hash(v) == hash(GraphId.parse('3.1'))
+    e = GraphEdge('4.1', None, '3.1', '3.2', 'rel', {'w': 1.5})
+    assert (e.sid, e.tid) == (GraphId.parse('3.1'), GraphId.parse('3.2'))
+
+################################################################################
+# implicit property fetches ####################################################
+################################################################################
+
+class SyncGraph:
+
+    def __init__(self):
+        self.fetched = []
+
+    def fetch_properties(self, entities, keys=None):
+        self.fetched.append(keys)
+        for entity in entities:
+            entity._cache_properties({'a': 1} if keys is None else {}, keys)
+
+
+class AsyncGraph:
+
+    async def fetch_properties(self, entities, keys=None):
+        pass
+
+def test_get_fetches_uncached_key_once():
+    graph = SyncGraph()
+    v = GraphVertex('3.1', graph, 'gene', {})
+    assert v.get('missing') is None
+    assert v.get('missing') is None
+    assert graph.fetched == [['missing']]
+
+def test_async_entities_do_not_fetch_implicitly():
+    v = GraphVertex('3.1', AsyncGraph(), 'gene', {'a': 1})
+    assert v.get('a') == 1
+    with pytest.raises(TypeError):
+        v.get('missing')
+    e = GraphEdge('4.1', AsyncGraph(), '3.1', '3.2', 'rel', {})
+    with pytest.raises(TypeError):
+        e.get_properties()
+
+def test_graphid_compares_to_text():
+    ID = GraphId.parse('3.17')
+    assert ID == '3.17' and '3.17' == ID
+    assert ID != '3.18' and not (ID != '3.17')
+    assert ID != 'TP53'
+    assert ID == (3 << 48) | 17
+    assert {ID: 1}[GraphId.parse('3.17')] == 1
+
+def test_entity_id_oid_index():
+    v = GraphVertex('3.17', None, 'gene', {})
+    assert v.id == '3.17'
+    assert (v.oid, v.index) == (3, 17)